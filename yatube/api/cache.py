@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+def post_cache_key(post_id):
+    return f'api:post:{post_id}'
+
+
+def get_cached_posts(post_ids):
+    """Словарь id -> сериализованный пост для найденных в кеше постов."""
+    keys = {post_cache_key(post_id): post_id for post_id in post_ids}
+    return {
+        keys[key]: data for key, data in cache.get_many(keys).items()
+    }
+
+
+def cache_posts(posts_data):
+    cache.set_many(
+        {post_cache_key(post_id): data
+         for post_id, data in posts_data.items()},
+        settings.API_POST_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_post(post_id):
+    cache.delete(post_cache_key(post_id))
+
+
+def invalidate_posts(post_ids):
+    cache.delete_many([post_cache_key(post_id) for post_id in post_ids])
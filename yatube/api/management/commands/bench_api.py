@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmark import benchmark_database, format_timing, measure
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время ответа HTML-страниц и JSON API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            post, group, reader = self.seed(options['posts'])
+            client = Client()
+            client.force_login(reader)
+            pairs = (
+                ('index', (), ()),
+                ('group_list', (group.slug,), (group.slug,)),
+                ('profile', (post.author.username,),
+                 (post.author.username,)),
+                ('follow_index', (), ()),
+                ('post_detail', (post.id,), (post.id,)),
+            )
+            for name, html_args, api_args in pairs:
+                for namespace, args in (('posts', html_args),
+                                        ('api', api_args)):
+                    url = reverse(f'{namespace}:{name}', args=args)
+                    timing = measure(
+                        lambda: client.get(url), options['iterations']
+                    )
+                    self.stdout.write(format_timing(url, timing))
+
+    def seed(self, number_of_posts):
+        authors = [
+            User.objects.create_user(username=f'author{i}')
+            for i in range(10)
+        ]
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=author) for author in authors[:5]
+        )
+        group = Group.objects.create(
+            title='Группа', slug='bench', description='Группа для замеров'
+        )
+        Post.objects.bulk_create(
+            Post(
+                text=f'Пост {i}', author=authors[i % len(authors)],
+                group=group if i % 2 else None,
+            )
+            for i in range(number_of_posts)
+        )
+        post = Post.objects.latest('id')
+        Comment.objects.bulk_create(
+            Comment(post=post, author=reader, text=f'Комментарий {i}')
+            for i in range(100)
+        )
+        return post, group, reader
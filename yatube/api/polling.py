@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Q
+
+from posts.models import Post
+
+INDEX_MARK_KEY = 'api:new:index'
+
+# Отметка автора без постов: в кеше хранится, в сравнениях не участвует.
+NO_POSTS = ()
+
+
+def author_mark_key(author_id):
+    return f'api:new:author:{author_id}'
+
+
+def get_index_mark():
+    """(pub_date, id) самого нового поста в общей ленте."""
+    mark = cache.get(INDEX_MARK_KEY)
+    if mark is None:
+        mark = Post.objects.order_by('-pub_date', '-id').values_list(
+            'pub_date', 'id'
+        ).first() or NO_POSTS
+        cache.set(INDEX_MARK_KEY, mark, settings.API_FEED_MARK_TIMEOUT)
+    return mark
+
+
+def get_author_marks(author_ids):
+    """Словарь author_id -> (pub_date, id) последнего поста автора.
+
+    Промахи кеша добираются двумя запросами на всех авторов сразу.
+    """
+    keys = {author_mark_key(author_id): author_id for author_id in author_ids}
+    marks = {keys[key]: mark for key, mark in cache.get_many(keys).items()}
+    missing = [author_id for author_id in author_ids if author_id not in marks]
+    if missing:
+        latest = dict(
+            Post.objects.filter(author_id__in=missing).order_by().values(
+                'author_id'
+            ).annotate(latest=Max('id')).values_list('author_id', 'latest')
+        )
+        dates = dict(
+            Post.objects.filter(pk__in=latest.values()).values_list(
+                'id', 'pub_date'
+            )
+        )
+        fetched = {
+            author_id: (
+                (dates[latest[author_id]], latest[author_id])
+                if author_id in latest else NO_POSTS
+            )
+            for author_id in missing
+        }
+        cache.set_many(
+            {author_mark_key(author_id): mark
+             for author_id, mark in fetched.items()},
+            settings.API_FEED_MARK_TIMEOUT,
+        )
+        marks.update(fetched)
+    return marks
+
+
+def advance_marks(post):
+    """Поднимает отметки общей ленты и автора до нового поста.
+
+    Отметка обновляется, а не удаляется: опрос сразу видит новый пост,
+    не дожидаясь пересчёта. В другом процессе с локальным кешем она
+    отстаёт не дольше API_FEED_MARK_TIMEOUT.
+    """
+    mark = (post.pub_date, post.pk)
+    keys = [INDEX_MARK_KEY, author_mark_key(post.author_id)]
+    current = cache.get_many(keys)
+    cache.set_many(
+        {key: mark for key in keys if current.get(key, NO_POSTS) < mark},
+        settings.API_FEED_MARK_TIMEOUT,
+    )
+
+
+def invalidate_marks(author_id):
+    cache.delete_many([INDEX_MARK_KEY, author_mark_key(author_id)])
+
+
+def newer_post_ids(queryset, position, limit):
+    """До limit + 1 id постов новее позиции, только по индексу ленты."""
+    value, pk = position
+    return list(
+        queryset.filter(
+            Q(pub_date__gt=value) | Q(pub_date=value, pk__gt=pk)
+        ).order_by('-pub_date', '-id').values_list('id', flat=True)[
+            :limit + 1
+        ]
+    )
@@ -0,0 +1,85 @@
+"""Лёгкая сериализация для JSON API без форм и DRF.
+
+Каждое поле описывает, как достать значение из объекта, какие колонки
+нужны в SELECT и какие связи подтянуть JOIN. Так ?fields= сужает не только
+ответ, но и сам запрос.
+"""
+from collections import namedtuple
+
+from posts.thumbnails import thumbnail_url
+
+ApiField = namedtuple('ApiField', ['getter', 'columns', 'related'])
+
+
+def isoformat(name):
+    return lambda obj: getattr(obj, name).isoformat()
+
+
+POST_FIELDS = {
+    'id': ApiField(lambda post: post.id, ('id',), ()),
+    'text': ApiField(lambda post: post.text, ('text',), ()),
+    'pub_date': ApiField(isoformat('pub_date'), ('pub_date',), ()),
+    'author': ApiField(
+        lambda post: post.author.username,
+        ('author', 'author__username'), ('author',)
+    ),
+    'group': ApiField(
+        lambda post: post.group.slug if post.group_id else None,
+        ('group', 'group__slug'), ('group',)
+    ),
+    'image': ApiField(
+        lambda post: thumbnail_url(post.image), ('image',), ()
+    ),
+}
+
+# Пакетная выдача отдаёт посты целиком вместе с числом комментариев,
+# чтобы кешировать один словарь на пост независимо от ?fields=.
+BATCH_POST_FIELDS = dict(
+    POST_FIELDS,
+    comments_count=ApiField(lambda post: post.comments_count, (), ()),
+)
+
+COMMENT_FIELDS = {
+    'id': ApiField(lambda comment: comment.id, ('id',), ()),
+    'text': ApiField(lambda comment: comment.text, ('text',), ()),
+    'created': ApiField(isoformat('created'), ('created',), ()),
+    'author': ApiField(
+        lambda comment: comment.author.username,
+        ('author', 'author__username'), ('author',)
+    ),
+    'parent': ApiField(lambda comment: comment.parent_id, ('parent',), ()),
+    'depth': ApiField(lambda comment: comment.depth, ('depth',), ()),
+}
+
+
+def parse_fields(request, spec):
+    """Поля из ?fields=a,b; неизвестные отбрасываются, id есть всегда."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(spec)
+    fields = ['id']
+    for name in requested.split(','):
+        name = name.strip()
+        if name in spec and name not in fields:
+            fields.append(name)
+    return fields
+
+
+def prepare_queryset(queryset, fields, spec, *extra_columns):
+    columns = set(extra_columns)
+    related = set()
+    for name in fields:
+        columns.update(spec[name].columns)
+        related.update(spec[name].related)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+def serialize(objects, fields, spec):
+    getters = [(name, spec[name].getter) for name in fields]
+    return [{name: getter(obj) for name, getter in getters} for obj in objects]
+
+
+def select_fields(data, fields):
+    return {name: data[name] for name in fields}
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Post
+
+from .cache import invalidate_post
+from .polling import advance_marks, invalidate_marks
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_post(sender, instance, **kwargs):
+    invalidate_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def advance_feed_marks(sender, instance, created, **kwargs):
+    """Сдвигает отметки последнего поста у общей ленты и у автора."""
+    if created:
+        advance_marks(instance)
+
+
+@receiver(post_delete, sender=Post)
+def reset_deleted_post_marks(sender, instance, **kwargs):
+    invalidate_marks(instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments_count(sender, instance, **kwargs):
+    if instance.post_id is not None:
+        invalidate_post(instance.post_id)
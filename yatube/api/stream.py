@@ -0,0 +1,44 @@
+import json
+import queue
+
+from django.conf import settings
+
+from posts.follows import get_following_ids
+from posts.live import hub
+
+RESYNC_FRAME = 'event: resync\ndata: {}\n\n'
+HEARTBEAT_FRAME = ': heartbeat\n\n'
+
+
+def sse_frame(message):
+    return (
+        f'id: {message["id"]}\n'
+        f'event: post\n'
+        f'data: {json.dumps(message)}\n\n'
+    )
+
+
+def follow_stream(user_id, subscription, missed):
+    """Кадры SSE: пропущенные события, затем новые посты и heartbeat.
+
+    Пока событий нет, раз в LIVE_HEARTBEAT секунд уходит комментарий,
+    чтобы прокси не закрыли соединение, а список авторов обновляется
+    из кеша подписок. Отписка происходит при закрытии ответа.
+    """
+    try:
+        yield f'retry: {settings.LIVE_RETRY_MS}\n\n'
+        for message in missed:
+            yield sse_frame(message)
+        while True:
+            if subscription.overflowed:
+                subscription.drain()
+                yield RESYNC_FRAME
+            try:
+                message = subscription.get(timeout=settings.LIVE_HEARTBEAT)
+            except queue.Empty:
+                subscription.author_ids = get_following_ids(user_id)
+                yield HEARTBEAT_FRAME
+                continue
+            yield sse_frame(message)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,299 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from api.polling import INDEX_MARK_KEY, author_mark_key
+from api.stream import follow_stream
+from posts.live import Relay, hub, origin
+from posts.models import Comment, Follow, Group, LiveEvent, Post
+
+User = get_user_model()
+
+
+@override_settings(API_PAGE_SIZE=3)
+class ApiViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test-slug',
+            description='test group desc'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'post {i}', author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.user, text='comment'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_index_pages_with_cursor(self):
+        response = self.client.get(reverse('api:index'))
+        data = response.json()
+        self.assertEqual(
+            [post['text'] for post in data['results']],
+            ['post 4', 'post 3', 'post 2'],
+        )
+        response = self.client.get(
+            reverse('api:index'), {'cursor': data['next_cursor']}
+        )
+        data = response.json()
+        self.assertEqual(
+            [post['text'] for post in data['results']], ['post 1', 'post 0']
+        )
+        self.assertIsNone(data['next_cursor'])
+
+    def test_sparse_fields(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('api:index'), {'fields': 'text,unknown'}
+            )
+        first = response.json()['results'][0]
+        self.assertEqual(first, {'id': self.posts[4].id, 'text': 'post 4'})
+
+    def test_group_feed_contains_only_group_posts(self):
+        response = self.client.get(
+            reverse('api:group_list', args=[self.group.slug])
+        )
+        results = response.json()['results']
+        self.assertEqual(len(results), 2)
+        self.assertTrue(
+            all(post['group'] == self.group.slug for post in results)
+        )
+
+    def test_follow_feed(self):
+        response = self.client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        Follow.objects.create(user=self.user, author=self.author)
+        response = self.authorized_client.get(reverse('api:follow_index'))
+        self.assertEqual(
+            len(response.json()['results']), settings.API_PAGE_SIZE
+        )
+
+    def test_post_detail_and_comments(self):
+        post = self.posts[0]
+        response = self.client.get(reverse('api:post_detail', args=[post.id]))
+        self.assertEqual(response.json(), {
+            'id': post.id,
+            'text': post.text,
+            'pub_date': post.pub_date.isoformat(),
+            'author': self.author.username,
+            'group': None,
+            'image': None,
+        })
+        response = self.client.get(
+            reverse('api:post_comments', args=[post.id])
+        )
+        self.assertEqual(
+            response.json()['results'][0]['author'], self.user.username
+        )
+        response = self.client.get(reverse('api:post_detail', args=[0]))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_posts_batch(self):
+        url = reverse('api:posts_batch')
+        ids = f'{self.posts[1].id},0,{self.posts[0].id}'
+        response = self.client.get(url, {'ids': ids})
+        data = response.json()
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.posts[1].id, self.posts[0].id],
+        )
+        self.assertEqual(data['results'][1]['comments_count'], 1)
+        self.assertEqual(data['not_found'], [0])
+        with self.assertNumQueries(0):
+            self.client.get(url, {'ids': f'{self.posts[0].id}'})
+
+    def test_posts_batch_invalidated_by_comment(self):
+        url = reverse('api:posts_batch')
+        params = {'ids': str(self.posts[0].id), 'fields': 'comments_count'}
+        self.client.get(url, params)
+        Comment.objects.create(
+            post=self.posts[0], author=self.user, text='another comment'
+        )
+        response = self.client.get(url, params)
+        self.assertEqual(
+            response.json()['results'],
+            [{'id': self.posts[0].id, 'comments_count': 2}],
+        )
+
+    @override_settings(API_BATCH_MAX_IDS=2)
+    def test_posts_batch_rejects_bad_ids(self):
+        url = reverse('api:posts_batch')
+        for ids in ('', '1,x', '1,2,3'):
+            with self.subTest(ids=ids):
+                response = self.client.get(url, {'ids': ids})
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+
+@override_settings(API_NEW_POSTS_LIMIT=2)
+class NewPostsPollingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Post.objects.create(text='old', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def poll(self, client, name, cursor=None):
+        params = {'cursor': cursor} if cursor else {}
+        return client.get(reverse(name), params).json()
+
+    def test_index_counts_new_posts_with_capped_ids(self):
+        cursor = self.poll(self.client, 'api:index_new')['cursor']
+        with self.assertNumQueries(0):
+            data = self.poll(self.client, 'api:index_new', cursor)
+        self.assertEqual(data['count'], 0)
+        posts = [
+            Post.objects.create(text=f'new {i}', author=self.stranger)
+            for i in range(3)
+        ]
+        data = self.poll(self.client, 'api:index_new', cursor)
+        self.assertEqual(data['count'], 2)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(data['ids'], [posts[2].id, posts[1].id])
+        data = self.poll(self.client, 'api:index_new', data['cursor'])
+        self.assertEqual((data['count'], data['has_more']), (0, False))
+
+    def test_publication_advances_cached_mark(self):
+        self.poll(self.client, 'api:index_new')
+        post = Post.objects.create(text='new', author=self.stranger)
+        self.assertEqual(
+            cache.get(INDEX_MARK_KEY), (post.pub_date, post.id)
+        )
+        self.assertEqual(
+            cache.get(author_mark_key(self.stranger.id)),
+            (post.pub_date, post.id)
+        )
+
+    def test_follow_feed_ignores_other_authors(self):
+        response = self.client.get(reverse('api:follow_new'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        cursor = self.poll(self.authorized_client, 'api:follow_new')['cursor']
+        Post.objects.create(text='stranger', author=self.stranger)
+        with self.assertNumQueries(0):
+            data = self.poll(self.authorized_client, 'api:follow_new', cursor)
+        self.assertEqual(data['count'], 0)
+        post = Post.objects.create(text='followed', author=self.author)
+        data = self.poll(self.authorized_client, 'api:follow_new', cursor)
+        self.assertEqual(data['ids'], [post.id])
+
+
+@override_settings(LIVE_RELAY=False, LIVE_HEARTBEAT=0.01)
+class LiveStreamTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_stream_pushes_followed_posts(self):
+        response = self.client.get(reverse('api:follow_live'))
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        response = self.authorized_client.get(reverse('api:follow_live'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = iter(response.streaming_content)
+        self.assertTrue(next(frames).startswith(b'retry:'))
+        self.assertEqual(next(frames), b': heartbeat\n\n')
+        for author in (self.stranger, self.author):
+            client = Client()
+            client.force_login(author)
+            client.post(reverse('posts:post_create'), {'text': 'live'})
+        post = Post.objects.get(author=self.author)
+        frame = next(frames).decode()
+        self.assertIn('event: post', frame)
+        self.assertIn(f'"post_id": {post.id}', frame)
+        response.close()
+        self.assertFalse(hub.subscriptions)
+
+    def test_reconnect_replays_missed_events(self):
+        events = [
+            LiveEvent.objects.create(
+                origin='other', author_id=author.id, post_id=0
+            )
+            for author in (self.author, self.stranger, self.author)
+        ]
+        response = self.authorized_client.get(
+            reverse('api:follow_live'), HTTP_LAST_EVENT_ID=str(events[0].id)
+        )
+        frames = iter(response.streaming_content)
+        next(frames)
+        frame = next(frames).decode()
+        self.assertTrue(frame.startswith(f'id: {events[2].id}'))
+        response.close()
+
+    @override_settings(LIVE_QUEUE_SIZE=1)
+    def test_slow_client_gets_resync(self):
+        subscription = hub.subscribe([self.author.id])
+        for event_id in (1, 2):
+            hub.publish({
+                'id': event_id, 'post_id': 0, 'author_id': self.author.id
+            })
+        frames = follow_stream(self.user.id, subscription, [])
+        next(frames)
+        self.assertIn('resync', next(frames))
+        self.assertEqual(next(frames), ': heartbeat\n\n')
+        frames.close()
+        self.assertFalse(hub.subscriptions)
+
+    def test_relay_forwards_other_processes_events(self):
+        subscription = hub.subscribe([self.author.id])
+        relay = Relay(hub)
+        relay.last_id = 0
+        LiveEvent.objects.create(
+            origin=origin(), author_id=self.author.id, post_id=1
+        )
+        LiveEvent.objects.create(
+            origin='other', author_id=self.author.id, post_id=2
+        )
+        self.assertEqual(relay.poll_once(), 1)
+        self.assertEqual(subscription.get(timeout=0)['post_id'], 2)
+        hub.unsubscribe(subscription)
+
+    def test_publish_prunes_old_events_without_subscribers(self):
+        old = LiveEvent.objects.create(
+            origin='other', author_id=self.author.id, post_id=0
+        )
+        LiveEvent.objects.filter(pk=old.pk).update(
+            created=timezone.now() - timedelta(
+                seconds=settings.LIVE_EVENT_TTL + 1
+            )
+        )
+        hub.next_prune = 0
+        client = Client()
+        client.force_login(self.author)
+        client.post(reverse('posts:post_create'), {'text': 'live'})
+        self.assertIsNone(hub.relay)
+        self.assertFalse(LiveEvent.objects.filter(pk=old.pk).exists())
+        self.assertEqual(LiveEvent.objects.count(), 1)
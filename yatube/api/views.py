@@ -0,0 +1,239 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.http import JsonResponse, StreamingHttpResponse
+
+from core.routers import use_replica
+from posts.archive import (
+    archived_max_id, get_with_archive, in_archived_range,
+    paginate_with_archive,
+)
+from posts.follows import following_posts, get_following_ids
+from posts.groups import get_group
+from posts.live import hub, missed_events
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+from posts.pagination import cursor_position, encode_cursor
+
+from .cache import cache_posts, get_cached_posts
+from .polling import get_author_marks, get_index_mark, newer_post_ids
+from .serializers import (
+    BATCH_POST_FIELDS, COMMENT_FIELDS, POST_FIELDS, parse_fields,
+    prepare_queryset, select_fields, serialize
+)
+from .stream import follow_stream
+
+User = get_user_model()
+
+
+def error_response(status, detail):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def page_response(request, queryset, spec, ordering, archived=None):
+    """Страница по курсору; archived продолжает ленту записями архива."""
+    fields = parse_fields(request, spec)
+    queryset = prepare_queryset(queryset, fields, spec, ordering)
+    if archived is not None:
+        archived = prepare_queryset(archived, fields, spec, ordering)
+    page = paginate_with_archive(
+        queryset, archived, ordering, request.GET.get('cursor'),
+        settings.API_PAGE_SIZE
+    )
+    return JsonResponse({
+        'results': serialize(page.items, fields, spec),
+        'next_cursor': page.next_cursor,
+    })
+
+
+def feed_response(request, queryset, archived):
+    return page_response(
+        request, queryset, POST_FIELDS, 'pub_date', archived
+    )
+
+
+def new_posts_response(request, queryset, latest):
+    """Сколько постов новее курсора и их id, не больше API_NEW_POSTS_LIMIT.
+
+    latest — (pub_date, id) самого нового поста ленты из кеша: если
+    курсор не старше его, ответ обходится без запроса к базе. Без
+    курсора возвращается только курсор на самый новый пост.
+    """
+    position = cursor_position(Post, 'pub_date', request.GET.get('cursor'))
+    ids = []
+    if position is not None and latest and latest > position:
+        ids = newer_post_ids(
+            queryset, position, settings.API_NEW_POSTS_LIMIT
+        )
+    limit = settings.API_NEW_POSTS_LIMIT
+    return JsonResponse({
+        'count': min(len(ids), limit),
+        'has_more': len(ids) > limit,
+        'ids': ids[:limit],
+        'cursor': encode_cursor(*latest) if latest else None,
+    })
+
+
+@use_replica
+def index(request):
+    return feed_response(
+        request, Post.objects.all(), ArchivedPost.objects.all()
+    )
+
+
+@use_replica
+def index_new(request):
+    return new_posts_response(request, Post.objects.all(), get_index_mark())
+
+
+@use_replica
+def group_list(request, slug):
+    group = get_group(slug)
+    if group is None:
+        return error_response(404, 'Группа не найдена.')
+    return feed_response(
+        request,
+        Post.objects.filter(group_id=group.id),
+        ArchivedPost.objects.filter(group_id=group.id),
+    )
+
+
+@use_replica
+def profile(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'id', flat=True
+    ).first()
+    if author_id is None:
+        return error_response(404, 'Пользователь не найден.')
+    return feed_response(
+        request,
+        Post.objects.filter(author_id=author_id),
+        ArchivedPost.objects.filter(author_id=author_id),
+    )
+
+
+@use_replica
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return error_response(401, 'Нужна авторизация.')
+    return feed_response(
+        request,
+        following_posts(request.user.id),
+        ArchivedPost.objects.filter(
+            author_id__in=get_following_ids(request.user.id)
+        ),
+    )
+
+
+@use_replica
+def follow_new(request):
+    if not request.user.is_authenticated:
+        return error_response(401, 'Нужна авторизация.')
+    marks = get_author_marks(get_following_ids(request.user.id))
+    position = cursor_position(Post, 'pub_date', request.GET.get('cursor'))
+    # Запрашиваем посты только тех авторов, у кого есть что-то новее.
+    active = [
+        author_id for author_id, mark in marks.items()
+        if mark and (position is None or mark > position)
+    ]
+    latest = max((mark for mark in marks.values() if mark), default=None)
+    return new_posts_response(
+        request, Post.objects.filter(author_id__in=active), latest
+    )
+
+
+def follow_live(request):
+    """SSE-поток новых постов избранных авторов.
+
+    Каждое соединение занимает поток сервера, поэтому в продакшене
+    точку нужно обслуживать потоковым или асинхронным воркером.
+    """
+    if not request.user.is_authenticated:
+        return error_response(401, 'Нужна авторизация.')
+    author_ids = get_following_ids(request.user.id)
+    subscription = hub.subscribe(author_ids)
+    missed = []
+    last_event_id = request.META.get('HTTP_LAST_EVENT_ID', '')
+    if last_event_id.isdigit():
+        missed = missed_events(author_ids, int(last_event_id))
+    response = StreamingHttpResponse(
+        follow_stream(request.user.id, subscription, missed),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@use_replica
+def post_detail(request, post_id):
+    fields = parse_fields(request, POST_FIELDS)
+    post = get_with_archive(
+        prepare_queryset(Post.objects.all(), fields, POST_FIELDS),
+        prepare_queryset(ArchivedPost.objects.all(), fields, POST_FIELDS),
+        post_id,
+    )
+    if post is None:
+        return error_response(404, 'Пост не найден.')
+    return JsonResponse(serialize([post], fields, POST_FIELDS)[0])
+
+
+def parse_ids(raw):
+    try:
+        return list(dict.fromkeys(
+            int(value) for value in raw.split(',') if value.strip()
+        ))
+    except ValueError:
+        return None
+
+
+def batch_posts(model, post_ids):
+    return model.objects.select_related('author', 'group').annotate(
+        comments_count=Count('comments')
+    ).in_bulk(post_ids)
+
+
+@use_replica
+def posts_batch(request):
+    post_ids = parse_ids(request.GET.get('ids', ''))
+    if not post_ids:
+        return error_response(400, 'Передайте id постов через запятую.')
+    if len(post_ids) > settings.API_BATCH_MAX_IDS:
+        return error_response(
+            400, f'Не больше {settings.API_BATCH_MAX_IDS} постов за запрос.'
+        )
+    found = get_cached_posts(post_ids)
+    missing = [post_id for post_id in post_ids if post_id not in found]
+    if missing:
+        posts = batch_posts(Post, missing)
+        archived_ids = [
+            post_id for post_id in missing
+            if post_id not in posts and post_id <= archived_max_id()
+        ]
+        if archived_ids:
+            posts.update(batch_posts(ArchivedPost, archived_ids))
+        fetched = dict(zip(posts, serialize(
+            posts.values(), list(BATCH_POST_FIELDS), BATCH_POST_FIELDS
+        )))
+        cache_posts(fetched)
+        found.update(fetched)
+    fields = parse_fields(request, BATCH_POST_FIELDS)
+    return JsonResponse({
+        'results': [
+            select_fields(found[post_id], fields)
+            for post_id in post_ids if post_id in found
+        ],
+        'not_found': [
+            post_id for post_id in post_ids if post_id not in found
+        ],
+    })
+
+
+@use_replica
+def post_comments(request, post_id):
+    archived = None
+    if in_archived_range(post_id):
+        archived = ArchivedComment.objects.filter(post_id=post_id)
+    return page_response(
+        request, Comment.objects.filter(post_id=post_id),
+        COMMENT_FIELDS, 'created', archived
+    )
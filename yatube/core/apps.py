@@ -1,5 +1,28 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .auth import reset_cached_user, reset_logged_out_user
+        from .db import setup_sqlite_connection
+
+        connection_created.connect(
+            setup_sqlite_connection, dispatch_uid='core_sqlite_pragmas'
+        )
+        User = get_user_model()
+        post_save.connect(
+            reset_cached_user, sender=User, dispatch_uid='core_user_saved'
+        )
+        post_delete.connect(
+            reset_cached_user, sender=User, dispatch_uid='core_user_deleted'
+        )
+        user_logged_out.connect(
+            reset_logged_out_user, dispatch_uid='core_user_logged_out'
+        )
@@ -0,0 +1,109 @@
+"""Пользователь запроса из кеша вместо запроса к auth_user.
+
+В кеше лежит урезанная запись пользователя и хеш для проверки сессии.
+Ключ записи версионный: сохранение пользователя, в том числе смена
+пароля, и выход из аккаунта увеличивают версию, после чего старые
+записи не читаются, даже если их успел положить параллельный запрос.
+
+Кеш должен быть общим для воркеров, см. core.checks. QuerySet.update()
+сигналов не шлёт: после массовой правки пользователей вызывайте
+invalidate_cached_user, иначе запись живёт до AUTH_USER_CACHE_TIMEOUT.
+"""
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+)
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.crypto import constant_time_compare
+
+# Остальные поля остаются отложенными и подгружаются при обращении,
+# а save() на таком объекте пишет только загруженные поля.
+SLIM_USER_FIELDS = (
+    'id', 'username', 'first_name', 'last_name',
+    'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def slim_field_names():
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.attname in SLIM_USER_FIELDS
+    ]
+
+
+def user_version_key(user_id):
+    return f'auth:user:{user_id}:version'
+
+
+def get_user_version(user_id):
+    # Версия начинается с текущего времени: если ключ версии вытеснен из
+    # кеша, новая версия всё равно больше любой из прежних.
+    key = user_version_key(user_id)
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def invalidate_cached_user(user_id):
+    try:
+        cache.incr(user_version_key(user_id))
+    except ValueError:
+        pass
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}:v{get_user_version(user_id)}'
+
+
+def cache_user(key, user):
+    cache.set(key, {
+        'values': [getattr(user, name) for name in slim_field_names()],
+        'session_hash': user.get_session_auth_hash(),
+    }, settings.AUTH_USER_CACHE_TIMEOUT)
+
+
+def slim_user(record):
+    return get_user_model().from_db(
+        DEFAULT_DB_ALIAS, slim_field_names(), record['values']
+    )
+
+
+def get_user(request):
+    """Аналог django.contrib.auth.get_user с кешем урезанного пользователя.
+
+    При промахе, несовпадении хеша сессии или нестандартном бэкенде
+    проверку целиком выполняет Django, в том числе очистку сессии.
+    """
+    session = request.session
+    try:
+        user_id = get_user_model()._meta.pk.to_python(session[SESSION_KEY])
+        backend = session[BACKEND_SESSION_KEY]
+    except (KeyError, ValidationError):
+        return AnonymousUser()
+    if backend not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    key = user_cache_key(user_id)
+    record = cache.get(key)
+    if record is not None and constant_time_compare(
+        session.get(HASH_SESSION_KEY, ''), record['session_hash']
+    ):
+        return slim_user(record)
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache_user(key, user)
+    return user
+
+
+def reset_cached_user(sender, instance, **kwargs):
+    if instance.pk is not None:
+        invalidate_cached_user(instance.pk)
+
+
+def reset_logged_out_user(sender, request, user, **kwargs):
+    if user is not None and user.pk is not None:
+        invalidate_cached_user(user.pk)
@@ -0,0 +1,41 @@
+"""Общие помощники для команд bench_*.
+
+Замеры идут на временной тестовой базе, рабочая база не трогается.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+
+
+@contextmanager
+def benchmark_database(aliases=('default',)):
+    setup_test_environment()
+    old_config = setup_databases(
+        verbosity=0, interactive=False, aliases=set(aliases)
+    )
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, iterations):
+    """Медиана и среднее времени вызова func в миллисекундах."""
+    func()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), statistics.mean(timings)
+
+
+def format_timing(name, timing):
+    median, mean = timing
+    return f'{name:<40} медиана {median:8.3f} мс, среднее {mean:8.3f} мс'
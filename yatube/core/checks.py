@@ -0,0 +1,72 @@
+"""Проверки боевого окружения: `check --deploy` и запуск yatube.wsgi.
+
+Кеш сессий, пользователей и счётчиков должен быть общим для всех
+воркеров: LocMemCache у каждого процесса свой, и сброс записи в одном
+воркере не виден остальным.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from django.core.exceptions import ImproperlyConfigured
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def cache_is_process_local(alias='default'):
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_CACHES
+
+
+@register(Tags.caches, deploy=True)
+def check_auth_cache(app_configs, **kwargs):
+    uses_cache = (
+        settings.SESSION_ENGINE in CACHED_SESSION_ENGINES
+        or 'core.middleware.CachedAuthenticationMiddleware'
+        in settings.MIDDLEWARE
+    )
+    if not uses_cache or not cache_is_process_local():
+        return []
+    return [Error(
+        'Сессии и пользователи кешируются в LocMemCache.',
+        hint=(
+            'Выход и смена пароля сбрасывают кеш только в своём воркере; '
+            'укажите в CACHES общий кеш, например Memcached.'
+        ),
+        id='core.E001',
+    )]
+
+
+@register(Tags.caches, deploy=True)
+def check_ratelimit_cache(app_configs, **kwargs):
+    enabled = (
+        settings.RATELIMITS
+        and 'core.middleware.RateLimitMiddleware' in settings.MIDDLEWARE
+    )
+    if not enabled or not cache_is_process_local():
+        return []
+    return [Error(
+        'Счётчики RATELIMITS хранятся в LocMemCache.',
+        hint=(
+            'У каждого воркера свои счётчики, и фактический лимит в число '
+            'воркеров раз больше; укажите в CACHES общий кеш.'
+        ),
+        id='core.E002',
+    )]
+
+
+def require_shared_cache():
+    """Останавливает запуск боевого процесса с кешем одного воркера.
+
+    Вызывается из yatube.wsgi при DEBUG = False: без общего кеша лимиты
+    и сброс сессий молча не работают, а check --deploy могут не запустить.
+    """
+    errors = check_auth_cache(None) + check_ratelimit_cache(None)
+    if errors:
+        raise ImproperlyConfigured(
+            ' '.join(f'{error.msg} {error.hint}' for error in errors)
+        )
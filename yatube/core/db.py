@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def get_sqlite_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', {})
+
+
+def setup_sqlite_connection(sender, connection, **kwargs):
+    """Применяет PRAGMA из настроек к каждому новому соединению SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in get_sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,35 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+
+from core.benchmark import format_timing, measure
+from core.middleware import RateLimitMiddleware
+
+
+class Command(BaseCommand):
+    help = 'Замеряет накладные расходы RateLimitMiddleware на запрос.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        middleware = RateLimitMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().post(
+            reverse('posts:add_comment', args=[1])
+        )
+        request.user = AnonymousUser()
+        request.resolver_match = resolve(request.path)
+        view_name = request.resolver_match.view_name
+        limits = {
+            'без лимита': {},
+            'с лимитом': {view_name: {'rate': '1000000000/d'}},
+        }
+        for name, ratelimits in limits.items():
+            with override_settings(RATELIMITS=ratelimits):
+                timing = measure(
+                    lambda: middleware.process_view(request, None, (), {}),
+                    options['iterations'],
+                )
+            self.stdout.write(format_timing(name, timing))
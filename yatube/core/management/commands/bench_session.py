@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.benchmark import benchmark_database, format_timing, measure
+
+STOCK_AUTH = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+CACHED_AUTH = 'core.middleware.CachedAuthenticationMiddleware'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает накладные расходы на запрос залогиненного пользователя: '
+        'сессии в базе и AuthenticationMiddleware против кеша сессий и '
+        'пользователя.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        stock_middleware = [
+            STOCK_AUTH if name == CACHED_AUTH else name
+            for name in settings.MIDDLEWARE
+        ]
+        profiles = (
+            ('сессии в базе', 'django.contrib.sessions.backends.db',
+             stock_middleware),
+            ('кеш сессий и пользователя',
+             'django.contrib.sessions.backends.cached_db',
+             settings.MIDDLEWARE),
+        )
+        with benchmark_database():
+            get_user_model().objects.create_user(
+                username='bench', password='bench-password'
+            )
+            for name, engine, middleware in profiles:
+                with override_settings(
+                    SESSION_ENGINE=engine, MIDDLEWARE=middleware
+                ):
+                    self.run_profile(name, options['iterations'])
+
+    def run_profile(self, name, iterations):
+        client = Client()
+        client.login(username='bench', password='bench-password')
+        url = reverse('about:tech')
+        timing = measure(lambda: client.get(url), iterations)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        self.stdout.write(
+            f'{format_timing(name, timing)}, запросов к базе: '
+            f'{len(queries)}'
+        )
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.db import get_sqlite_pragmas
+
+SCHEMA = (
+    'CREATE TABLE post ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+    'text TEXT NOT NULL, '
+    'pub_date REAL NOT NULL, '
+    'author_id INTEGER NOT NULL)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+)
+FEED_QUERY = (
+    'SELECT id, text, author_id FROM post ORDER BY pub_date DESC LIMIT 10'
+)
+INSERT_QUERY = 'INSERT INTO post (text, pub_date, author_id) VALUES (?, ?, ?)'
+
+
+def new_post():
+    return ('new post', time.time(), 1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность конкурентных чтений и записей '
+        'SQLite без настроек и с PRAGMA из settings.SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=3.0)
+        parser.add_argument('--rows', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('default', {}),
+            ('tuned', get_sqlite_pragmas()),
+        )
+        for name, pragmas in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.prepare(path, pragmas, options['rows'])
+                reads, writes, errors = self.run(path, pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{name:>8}: {reads / seconds:10.0f} чтений/с '
+                f'{writes / seconds:8.0f} записей/с '
+                f'ошибок блокировки: {errors}'
+            )
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        for name, value in pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def prepare(self, path, pragmas, rows):
+        connection = self.connect(path, pragmas)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute('BEGIN')
+        connection.executemany(
+            INSERT_QUERY,
+            ((f'post {i}', i, i % 50) for i in range(rows)),
+        )
+        connection.execute('COMMIT')
+        connection.close()
+
+    def worker(self, path, pragmas, deadline, statement, params, key,
+               counters, lock):
+        connection = self.connect(path, pragmas)
+        while time.monotonic() < deadline:
+            try:
+                connection.execute(statement, params()).fetchall()
+            except sqlite3.OperationalError:
+                result = 'errors'
+            else:
+                result = key
+            with lock:
+                counters[result] += 1
+        connection.close()
+
+    def run(self, path, pragmas, options):
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+        roles = (
+            [(FEED_QUERY, tuple, 'reads')] * options['readers']
+            + [(INSERT_QUERY, new_post, 'writes')] * options['writers']
+        )
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(path, pragmas, deadline, statement, params, key,
+                      counters, lock),
+            )
+            for statement, params, key in roles
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counters['reads'], counters['writes'], counters['errors']
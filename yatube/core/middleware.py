@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.shortcuts import render
+from django.utils.functional import SimpleLazyObject
+
+from . import auth, ratelimit, routers
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware, берущий пользователя из кеша, см. core.auth.
+
+    Залогиненный запрос не обращается к auth_user, пока пользователь
+    не изменится или не выйдет из аккаунта.
+    """
+
+    def process_request(self, request):
+        assert hasattr(request, 'session'), (
+            'CachedAuthenticationMiddleware requires SessionMiddleware.'
+        )
+        request.user = SimpleLazyObject(lambda: auth.get_user(request))
+
+
+class PrimaryPinMiddleware:
+    """Закрепляет чтения пользователя за primary после его записи.
+
+    Пока жива кука REPLICA_PIN_COOKIE, реплики не используются, и
+    пользователь сразу видит свой пост, комментарий или подписку.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie = settings.REPLICA_PIN_COOKIE
+        routers.start_request(pinned=cookie in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.finish_request()
+        if wrote:
+            response.set_cookie(
+                cookie, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+class RateLimitMiddleware:
+    """Отвечает 429 с Retry-After, если маршрут исчерпал лимит RATELIMITS."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_name = request.resolver_match.view_name
+        retry_after = ratelimit.check_request(request, view_name)
+        if not retry_after:
+            return None
+        response = render(
+            request, 'core/429.html', {'retry_after': retry_after},
+            status=429
+        )
+        response['Retry-After'] = str(retry_after)
+        return response
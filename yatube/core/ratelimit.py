@@ -0,0 +1,64 @@
+"""Ограничение частоты запросов к маршрутам, которые пишут в базу.
+
+Для каждого пользователя и каждого IP заводится корзина на RATE токенов,
+которая целиком наполняется в начале каждого периода. Состояние корзины —
+счётчик потраченных токенов в кеше, списание — атомарный cache.incr.
+Кеш должен быть общим для воркеров, иначе лимит умножается на их число;
+check --deploy проверяет это, см. core.checks.
+"""
+import math
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+Rate = namedtuple('Rate', ['limit', 'period'])
+
+
+def parse_rate(rate):
+    """'10/m' -> Rate(10, 60)."""
+    limit, period = rate.split('/')
+    return Rate(int(limit), PERIODS[period])
+
+
+def get_route_limit(view_name, method):
+    config = settings.RATELIMITS.get(view_name)
+    if config is None:
+        return None
+    methods = config.get('methods', settings.RATELIMIT_DEFAULT_METHODS)
+    if method not in methods:
+        return None
+    return parse_rate(config['rate'])
+
+
+def get_client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def take_token(key, rate, now):
+    """Списывает токен; возвращает 0 или секунды до наполнения корзины."""
+    window = int(now // rate.period)
+    key = f'ratelimit:{key}:{window}'
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, rate.period)
+        used = cache.incr(key)
+    if used <= rate.limit:
+        return 0
+    return max(1, math.ceil((window + 1) * rate.period - now))
+
+
+def check_request(request, view_name):
+    """0, если запрос укладывается в лимиты, иначе Retry-After в секундах."""
+    rate = get_route_limit(view_name, request.method)
+    if rate is None:
+        return 0
+    now = time.time()
+    keys = [f'{view_name}:ip:{get_client_ip(request)}']
+    if request.user.is_authenticated:
+        keys.append(f'{view_name}:user:{request.user.pk}')
+    return max(take_token(key, rate, now) for key in keys)
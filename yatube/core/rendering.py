@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.shortcuts import render as django_render
+
+JINJA2_ENGINE = 'jinja2'
+
+
+def template_engine(request):
+    """Имя движка для view запроса: jinja2 для view из JINJA2_VIEWS."""
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.view_name in settings.JINJA2_VIEWS:
+        return JINJA2_ENGINE
+    return None
+
+
+def render(request, template_name, context=None, status=None):
+    """django.shortcuts.render с выбором движка по settings.JINJA2_VIEWS."""
+    return django_render(
+        request, template_name, context, status=status,
+        using=template_engine(request),
+    )
@@ -0,0 +1,79 @@
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def start_request(pinned):
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def finish_request():
+    """Возвращает True, если за время запроса была запись в базу."""
+    wrote = getattr(_state, 'wrote', False)
+    _state.pinned = False
+    _state.wrote = False
+    return wrote
+
+
+def mark_user_write():
+    """Закрепляет чтения пользователя за primary после его записи.
+
+    Вызывается view, которые пишут по действию пользователя: пост,
+    комментарий, подписка. Служебные записи при чтении страниц, например
+    сброс счётчика ленты или сохранение сессии, закрепления не ставят.
+    """
+    _state.wrote = True
+
+
+@contextmanager
+def replica_reads():
+    previous = getattr(_state, 'replica', False)
+    _state.replica = True
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+def use_replica(view):
+    """Разрешает view читать данные с реплики."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """Чтения из view с use_replica уходят на реплики, остальное на primary.
+
+    После записи пользователь закрепляется за primary, см. mark_user_write
+    и core.middleware.PrimaryPinMiddleware. Реплики получают схему
+    репликацией с primary, поэтому migrate их не трогает.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            replicas
+            and getattr(_state, 'replica', False)
+            and not getattr(_state, 'pinned', False)
+        ):
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
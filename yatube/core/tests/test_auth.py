@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.auth import get_user_version
+from core.checks import check_auth_cache
+
+User = get_user_model()
+
+
+class CachedUserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='username', password='old-password-123'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.login(username='username', password='old-password-123')
+
+    def test_user_and_session_served_from_cache(self):
+        url = reverse('about:tech')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, 'Пользователь: username')
+
+    def test_slim_user_saves_only_loaded_fields(self):
+        self.client.get(reverse('about:tech'))
+        response = self.client.get(reverse('about:tech'))
+        user = response.context['user']
+        self.assertIn('password', user.get_deferred_fields())
+        user.first_name = 'Имя'
+        user.save()
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.first_name, 'Имя')
+        self.assertTrue(user.check_password('old-password-123'))
+
+    def test_password_change_logs_out_other_sessions(self):
+        other_client = Client()
+        other_client.login(username='username', password='old-password-123')
+        url = reverse('about:tech')
+        other_client.get(url)
+        self.client.post(reverse('users:password_change_form'), {
+            'old_password': 'old-password-123',
+            'new_password1': 'new-password-456',
+            'new_password2': 'new-password-456',
+        })
+        response = self.client.get(url)
+        self.assertTrue(response.context['user'].is_authenticated)
+        response = other_client.get(url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_bumps_version(self):
+        self.client.get(reverse('about:tech'))
+        version = get_user_version(self.user.pk)
+        self.client.get(reverse('users:logout'))
+        self.assertGreater(get_user_version(self.user.pk), version)
+        response = self.client.get(reverse('about:tech'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+
+class AuthCacheCheckTest(SimpleTestCase):
+    def test_process_local_cache_rejected(self):
+        errors = check_auth_cache(None)
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+    def test_production_cache_is_shared(self):
+        from yatube import settings_production
+        with override_settings(CACHES=settings_production.CACHES):
+            self.assertEqual(check_auth_cache(None), [])
@@ -0,0 +1,26 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from core.db import setup_sqlite_connection
+
+
+class SQLitePragmasTest(TestCase):
+    def get_pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_connection(self):
+        """PRAGMA из настроек применены к текущему соединению."""
+        self.assertEqual(self.get_pragma('busy_timeout'), 5000)
+        self.assertEqual(self.get_pragma('synchronous'), 1)
+        self.assertEqual(self.get_pragma('temp_store'), 2)
+
+    def test_pragmas_follow_settings(self):
+        """Значения PRAGMA берутся из settings.SQLITE_PRAGMAS."""
+        with override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234}):
+            setup_sqlite_connection(sender=None, connection=connection)
+            self.assertEqual(self.get_pragma('busy_timeout'), 1234)
+        with override_settings(SQLITE_PRAGMAS={'busy_timeout': 5000}):
+            setup_sqlite_connection(sender=None, connection=connection)
+        self.assertEqual(self.get_pragma('busy_timeout'), 5000)
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.checks import check_ratelimit_cache, require_shared_cache
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(RATELIMITS={'posts:add_comment': {'rate': '2/m'}})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='user')
+        cls.post = Post.objects.create(text='text', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:add_comment', args=[self.post.id])
+
+    def test_over_limit_gets_429(self):
+        for _ in range(2):
+            response = self.authorized_client.post(self.url, {'text': 'hi'})
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.authorized_client.post(self.url, {'text': 'hi'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertTemplateUsed(response, 'core/429.html')
+        retry_after = int(response['Retry-After'])
+        self.assertTrue(1 <= retry_after <= 60)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_ip_bucket_shared_between_users(self):
+        other = User.objects.create_user(username='other')
+        other_client = Client()
+        other_client.force_login(other)
+        self.authorized_client.post(self.url, {'text': 'hi'})
+        self.authorized_client.post(self.url, {'text': 'hi'})
+        response = other_client.post(self.url, {'text': 'hi'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        response = other_client.post(
+            self.url, {'text': 'hi'}, REMOTE_ADDR='10.0.0.1'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_other_methods_not_counted(self):
+        for _ in range(3):
+            self.authorized_client.get(self.url)
+        response = self.authorized_client.post(self.url, {'text': 'hi'})
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+
+class RateLimitCacheCheckTest(SimpleTestCase):
+    def test_process_local_cache_rejected(self):
+        errors = check_ratelimit_cache(None)
+        self.assertEqual([error.id for error in errors], ['core.E002'])
+
+    def test_startup_fails_without_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            require_shared_cache()
+
+    @override_settings(RATELIMITS={})
+    def test_no_limits_no_error(self):
+        self.assertEqual(check_ratelimit_cache(None), [])
+
+    def test_production_cache_is_shared(self):
+        from yatube import settings_production
+        with override_settings(CACHES=settings_production.CACHES):
+            self.assertEqual(check_ratelimit_cache(None), [])
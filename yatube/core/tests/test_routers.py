@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Notification, Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTest(TestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+        cls.author = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.author, text='primary post')
+        replica_author = User.objects.db_manager('replica').create_user(
+            username='author'
+        )
+        Post.objects.using('replica').create(
+            author=replica_author, text='replica post'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def get_index_texts(self):
+        response = self.client.get(reverse('posts:index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_feed_reads_from_replica(self):
+        """Лента читается с реплики."""
+        self.assertEqual(self.get_index_texts(), ['replica post'])
+
+    def test_write_pins_reads_to_primary(self):
+        """После записи пользователь читает из primary."""
+        response = self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        self.assertEqual(
+            response.cookies[settings.REPLICA_PIN_COOKIE]['max-age'],
+            settings.REPLICA_PIN_SECONDS,
+        )
+        self.assertEqual(self.get_index_texts(), ['primary post'])
+
+    def test_page_reads_do_not_pin(self):
+        """Служебные записи при чтении страницы не закрепляют за primary."""
+        Notification.objects.create(
+            recipient=self.user, actor=self.author,
+            post=Post.objects.get(author=self.author),
+            kind=Notification.COMMENT, comment_id=1, text='comment',
+        )
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        self.assertFalse(Notification.objects.filter(read=False).exists())
+
+    def test_replica_not_migrated(self):
+        """migrate не применяет миграции к репликам."""
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
+
+    def test_pin_expires(self):
+        """Без куки закрепления чтения снова идут на реплику."""
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        del self.client.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(self.get_index_texts(), ['replica post'])
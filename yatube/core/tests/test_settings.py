@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from yatube import settings_production
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    def test_django_templates_match_base_settings(self):
+        production = settings_production.TEMPLATES[0]
+        base = settings.TEMPLATES[0]
+        self.assertEqual(
+            production['OPTIONS']['context_processors'],
+            base['OPTIONS']['context_processors'],
+        )
+        self.assertNotIn('APP_DIRS', production)
+        self.assertIn('loaders', production['OPTIONS'])
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from core.warmup import warm_up
+
+CACHED_TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [settings.TEMPLATES_DIR],
+        'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+
+class WarmUpTests(TestCase):
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_templates_compiled_into_cached_loader(self):
+        stats = warm_up()
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('posts/index.html', loader.get_template_cache)
+        self.assertIn('users/login.html', loader.get_template_cache)
+        self.assertGreater(stats['templates'], 0)
+        self.assertGreater(stats['url_namespaces'], 0)
+        self.assertEqual(stats['connections'], 1)
@@ -0,0 +1,70 @@
+"""Прогрев процесса перед первым запросом.
+
+Вызывается из yatube.wsgi при WARMUP_ON_STARTUP: компилирует все шаблоны
+в кеш загрузчика, заполняет словари URL-резолверов и открывает
+соединения с базами.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def iter_template_names(directories):
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, directory).replace(
+                        os.sep, '/'
+                    )
+
+
+def precompile_templates():
+    compiled = 0
+    for engine in engines.all():
+        directories = list(engine.dirs) + list(
+            get_app_template_dirs(engine.app_dirname)
+        )
+        for name in set(iter_template_names(directories)):
+            try:
+                engine.get_template(name)
+            except Exception:
+                logger.exception('Шаблон %s не скомпилирован', name)
+            else:
+                compiled += 1
+    return compiled
+
+
+def populate_url_resolvers():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    for _, namespace_resolver in resolver.namespace_dict.values():
+        namespace_resolver.reverse_dict
+    return len(resolver.namespace_dict)
+
+
+def open_connections():
+    aliases = [DEFAULT_DB_ALIAS] + list(settings.DATABASE_REPLICAS)
+    for alias in aliases:
+        connections[alias].ensure_connection()
+    return len(aliases)
+
+
+def warm_up():
+    stats = {
+        'templates': precompile_templates(),
+        'url_namespaces': populate_url_resolvers(),
+        'connections': open_connections(),
+    }
+    logger.info('Прогрев завершён: %s', stats)
+    return stats
@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+
+    list_display = (
+        'pk', 'task', 'status', 'attempts', 'run_at', 'created', 'finished'
+    )
+    search_fields = ('task',)
+    list_filter = ('status', 'task')
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import queue_metrics
+
+
+class Command(BaseCommand):
+    help = 'Показывает глубину очереди задач и задержки выполнения.'
+
+    def handle(self, *args, **options):
+        for name, value in queue_metrics().items():
+            self.stdout.write(f'{name}: {value}')
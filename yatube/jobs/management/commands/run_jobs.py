@@ -0,0 +1,75 @@
+import logging
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import (
+    claim, prune_finished_jobs, queue_metrics, release_stale_jobs, run_job,
+    worker_id,
+)
+
+logger = logging.getLogger('jobs')
+
+
+def work(burst, poll_interval, metrics_interval):
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *args: stopping.append(True))
+    worker = worker_id()
+    last_metrics = 0
+    while not stopping:
+        if time.monotonic() - last_metrics > metrics_interval:
+            release_stale_jobs()
+            prune_finished_jobs()
+            logger.info('Очередь задач: %s', queue_metrics())
+            last_metrics = time.monotonic()
+        job = claim(worker)
+        if job is not None:
+            run_job(job)
+            continue
+        if burst:
+            break
+        time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда готовых задач не останется.'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=settings.JOBS_POLL_INTERVAL
+        )
+        parser.add_argument('--metrics-interval', type=float, default=60)
+
+    def handle(self, *args, **options):
+        arguments = (
+            options['burst'], options['poll_interval'],
+            options['metrics_interval'],
+        )
+        if options['processes'] <= 1:
+            work(*arguments)
+            return
+        # Каждый процесс откроет своё соединение с базой.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=work, args=arguments)
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
@@ -0,0 +1,226 @@
+"""Очередь фоновых задач в базе данных.
+
+Задача — функция с декоратором @task; поставить её в очередь можно
+вызовом func.delay(**kwargs) прямо из view или сигнала, а с отсрочкой —
+enqueue(func.task_name, kwargs, delay=...). Аргументы сохраняются в JSON.
+Воркеры (manage.py run_jobs) забирают задачи условным UPDATE ...
+WHERE status='queued': он атомарен и на SQLite, поэтому одну задачу
+получает ровно один воркер.
+"""
+import json
+import logging
+import os
+import socket
+import statistics
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+CLAIM_ATTEMPTS = 5
+
+
+def task(func):
+    """Регистрирует функцию как фоновую задачу и добавляет func.delay()."""
+    name = f'{func.__module__}.{func.__qualname__}'
+    func.is_task = True
+    func.task_name = name
+    func.delay = lambda **kwargs: enqueue(name, kwargs)
+    return func
+
+
+def enqueue(name, kwargs=None, delay=0):
+    """Ставит задачу в очередь; kwargs — аргументы задачи словарём."""
+    return Job.objects.create(
+        task=name,
+        payload=json.dumps(kwargs or {}),
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def resolve_task(name):
+    func = import_string(name)
+    if not getattr(func, 'is_task', False):
+        raise ValueError(f'{name} не зарегистрирована как задача.')
+    return func
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def release_stale_jobs():
+    """Возвращает в очередь задачи воркеров, умерших посреди работы.
+
+    Захват уже считается попыткой, поэтому задача, которая раз за разом
+    роняет воркер, после JOBS_MAX_ATTEMPTS попыток помечается упавшей.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT),
+    )
+    failed = stale.filter(attempts__gte=settings.JOBS_MAX_ATTEMPTS).update(
+        status=Job.FAILED, finished=now, locked_by='', locked_at=None,
+        last_error='Воркер не завершил задачу за JOBS_LOCK_TIMEOUT.',
+    )
+    if failed:
+        logger.error('Задач без ответа воркера помечено упавшими: %s', failed)
+    return failed + stale.update(
+        status=Job.QUEUED, locked_by='', locked_at=None
+    )
+
+
+def prune_finished_jobs(batch_size=1000):
+    """Удаляет завершённые задачи старше JOBS_KEEP_FINISHED секунд.
+
+    Удаляет порциями по batch_size, возвращает число удалённых.
+    """
+    deadline = timezone.now() - timedelta(
+        seconds=settings.JOBS_KEEP_FINISHED
+    )
+    finished = Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED), finished__lt=deadline
+    ).order_by()
+    pruned = 0
+    while True:
+        job_ids = list(finished.values_list('id', flat=True)[:batch_size])
+        if not job_ids:
+            return pruned
+        Job.objects.filter(id__in=job_ids).delete()
+        pruned += len(job_ids)
+
+
+def claim(worker):
+    for _ in range(CLAIM_ATTEMPTS):
+        now = timezone.now()
+        job_id = Job.objects.filter(
+            status=Job.QUEUED, run_at__lte=now
+        ).values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now,
+            started=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def retry_delay(attempts):
+    return settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1)
+
+
+@contextmanager
+def heartbeat(job_id, worker):
+    """Продлевает захват задачи, пока она выполняется.
+
+    Раз в JOBS_HEARTBEAT_INTERVAL секунд обновляет locked_at, чтобы
+    release_stale_jobs не вернул долгую задачу в очередь второму воркеру.
+    """
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(settings.JOBS_HEARTBEAT_INTERVAL):
+                Job.objects.filter(
+                    pk=job_id, status=Job.RUNNING, locked_by=worker
+                ).update(locked_at=timezone.now())
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    worker = job.locked_by
+    try:
+        with heartbeat(job.pk, worker):
+            resolve_task(job.task)(**json.loads(job.payload))
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+            job.status = Job.FAILED
+            job.finished = timezone.now()
+            logger.error('Задача %s не выполнена: %s', job, job.last_error)
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=retry_delay(job.attempts)
+            )
+    else:
+        job.status = Job.DONE
+        job.finished = timezone.now()
+        job.last_error = ''
+    job.locked_by = ''
+    job.locked_at = None
+    # Если захват истёк и задачу взял другой воркер, его запись главнее.
+    saved = Job.objects.filter(pk=job.pk, locked_by=worker).update(
+        status=job.status, run_at=job.run_at, finished=job.finished,
+        last_error=job.last_error, locked_by='', locked_at=None,
+    )
+    if not saved:
+        logger.warning(
+            'Задача %s перехвачена другим воркером, результат %s не записан',
+            job, worker,
+        )
+    return job
+
+
+def run_pending(worker=None, limit=None):
+    """Выполняет готовые задачи, пока очередь не опустеет."""
+    worker = worker or worker_id()
+    done = 0
+    while limit is None or done < limit:
+        job = claim(worker)
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
+
+
+def queue_metrics(sample_size=1000):
+    """Глубина очереди по статусам и задержки последних задач в секундах."""
+    now = timezone.now()
+    metrics = {status: 0 for status, _ in Job.STATUS_CHOICES}
+    for row in Job.objects.order_by().values('status').annotate(
+        count=Count('id')
+    ):
+        metrics[row['status']] = row['count']
+    oldest = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).values_list('run_at', flat=True).first()
+    metrics['ready'] = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).count()
+    metrics['oldest_ready_age'] = (
+        (now - oldest).total_seconds() if oldest else 0
+    )
+    recent = Job.objects.filter(status=Job.DONE).order_by(
+        '-finished'
+    ).values_list('created', 'started', 'finished')[:sample_size]
+    waits = [(started - created).total_seconds()
+             for created, started, _ in recent]
+    runs = [(finished - started).total_seconds()
+            for _, started, finished in recent]
+    metrics['wait_median'] = statistics.median(waits) if waits else 0
+    metrics['run_median'] = statistics.median(runs) if runs else 0
+    return metrics
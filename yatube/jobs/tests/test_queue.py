@@ -0,0 +1,166 @@
+import json
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import (
+    claim, enqueue, prune_finished_jobs, queue_metrics, release_stale_jobs,
+    run_job, run_pending, task,
+)
+
+User = get_user_model()
+
+CALLS = []
+
+
+@task
+def remember(value):
+    CALLS.append(value)
+
+
+@task
+def schedule(name, delay):
+    CALLS.append((name, delay))
+
+
+@task
+def explode():
+    raise RuntimeError('boom')
+
+
+@task
+def outlive_lock(seconds):
+    """Работает дольше JOBS_LOCK_TIMEOUT и проверяет, не отпущена ли."""
+    time.sleep(seconds)
+    CALLS.append(release_stale_jobs())
+
+
+def not_a_task():
+    CALLS.append('unexpected')
+
+
+@override_settings(JOBS_MAX_ATTEMPTS=2, JOBS_RETRY_BACKOFF=30)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_delay_and_run(self):
+        job = remember.delay(value='hello')
+        self.assertEqual(json.loads(job.payload), {'value': 'hello'})
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(CALLS, ['hello'])
+
+    def test_job_claimed_once(self):
+        remember.delay(value='once')
+        self.assertIsNotNone(claim('worker-1'))
+        self.assertIsNone(claim('worker-2'))
+
+    def test_retry_with_backoff_then_fail(self):
+        job = explode.delay()
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=25))
+        self.assertEqual(run_pending(), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_result_not_written_over_new_claim(self):
+        remember.delay(value='late')
+        job = claim('worker-1')
+        # Захват истёк, и задачу уже выполняет второй воркер.
+        Job.objects.filter(pk=job.pk).update(locked_by='worker-2')
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.locked_by, 'worker-2')
+
+    def test_task_kwargs_named_like_enqueue_params(self):
+        job = schedule.delay(name='digest', delay=60)
+        self.assertLessEqual(job.run_at, timezone.now())
+        run_pending()
+        self.assertEqual(CALLS, [('digest', 60)])
+
+    def test_stale_job_fails_after_max_attempts(self):
+        job = remember.delay(value='crash')
+        expired = timezone.now() - timedelta(hours=1)
+        for attempt in range(2):
+            claim('worker-1')
+            Job.objects.filter(pk=job.pk).update(locked_at=expired)
+            self.assertEqual(release_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(run_pending(), 0)
+        self.assertEqual(CALLS, [])
+
+    def test_only_registered_tasks_run(self):
+        Job.objects.create(task=f'{__name__}.not_a_task')
+        run_pending()
+        self.assertEqual(CALLS, [])
+
+    def test_metrics(self):
+        remember.delay(value='a')
+        explode.delay()
+        metrics = queue_metrics()
+        self.assertEqual(metrics['queued'], 2)
+        self.assertEqual(metrics['ready'], 2)
+        run_pending()
+        metrics = queue_metrics()
+        self.assertEqual(metrics['done'], 1)
+
+    @override_settings(JOBS_KEEP_FINISHED=60)
+    def test_prune_finished_jobs(self):
+        old = remember.delay(value='old')
+        remember.delay(value='new')
+        queued = enqueue(remember.task_name, {'value': 'queued'}, delay=60)
+        run_pending()
+        Job.objects.filter(pk=old.pk).update(
+            finished=timezone.now() - timedelta(seconds=120)
+        )
+        self.assertEqual(prune_finished_jobs(batch_size=1), 1)
+        self.assertFalse(Job.objects.filter(pk=old.pk).exists())
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertTrue(Job.objects.filter(pk=queued.pk).exists())
+
+    def test_password_reset_email_queued(self):
+        User.objects.create_user(
+            username='user', email='user@example.com', password='pass'
+        )
+        self.client.post(
+            reverse('users:password_reset_form'),
+            {'email': 'user@example.com'},
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(
+            Job.objects.filter(task='users.tasks.send_email').exists()
+        )
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+
+
+@override_settings(JOBS_LOCK_TIMEOUT=0.2, JOBS_HEARTBEAT_INTERVAL=0.05)
+class JobHeartbeatTests(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_long_job_keeps_lock(self):
+        job = outlive_lock.delay(seconds=0.5)
+        run_pending()
+        self.assertEqual(CALLS, [0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
@@ -0,0 +1,119 @@
+"""Архив старых постов: горячие таблицы Post и Comment остаются маленькими.
+
+Все посты архива старше всех горячих, поэтому в архив заглядываем,
+только когда лента по курсору дошла до конца горячих записей или
+запрошенный id не больше наибольшего id в архиве.
+
+Перенос не удаляет данные, которые видят пользователи: пост остаётся
+в сводке своей группы, уведомления о нём остаются во входящих, а
+лайки замораживаются в ArchivedPost.like_count. Удаляются только
+строки, нужные горячему посту: Like, шарды счётчика и PostScore.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+from django.db.models.deletion import Collector
+
+from .likes import pending_likes
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .pagination import CursorPage, encode_cursor, paginate_by_cursor
+
+ARCHIVE_MAX_ID_KEY = 'archive:max_post_id'
+
+
+def archived_max_id():
+    """Наибольший id поста в архиве; 0, если архив пуст."""
+    max_id = cache.get(ARCHIVE_MAX_ID_KEY)
+    if max_id is None:
+        max_id = ArchivedPost.objects.aggregate(max_id=Max('id'))['max_id']
+        max_id = max_id or 0
+        cache.set(ARCHIVE_MAX_ID_KEY, max_id, settings.ARCHIVE_CACHE_TIMEOUT)
+    return max_id
+
+
+def in_archived_range(post_id):
+    return post_id <= archived_max_id()
+
+
+def get_with_archive(queryset, archived_queryset, pk):
+    """Объект горячей таблицы, а если его нет — из архива по тому же pk."""
+    obj = queryset.filter(pk=pk).first()
+    if obj is None and in_archived_range(pk):
+        obj = archived_queryset.filter(pk=pk).first()
+    return obj
+
+
+def paginate_with_archive(queryset, archived_queryset, field, cursor, limit):
+    """paginate_by_cursor, который продолжает ленту записями архива."""
+    page = paginate_by_cursor(queryset, field, cursor, limit)
+    if (
+        archived_queryset is None
+        or page.next_cursor is not None
+        or not archived_max_id()
+    ):
+        return page
+    if page.items:
+        last = page.items[-1]
+        cursor = encode_cursor(getattr(last, field), last.pk)
+        if len(page.items) == limit:
+            return CursorPage(page.items, cursor)
+    archived = paginate_by_cursor(
+        archived_queryset, field, cursor, limit - len(page.items)
+    )
+    return CursorPage(page.items + archived.items, archived.next_cursor)
+
+
+def archive_chunk(before, chunk_size):
+    """Переносит в архив до chunk_size постов старше before с комментариями.
+
+    Каждая порция — отдельная транзакция. Возвращает число постов.
+    """
+    with transaction.atomic():
+        posts = list(
+            Post.objects.filter(pub_date__lt=before).order_by(
+                'pub_date', 'id'
+            )[:chunk_size]
+        )
+        if not posts:
+            return 0
+        post_ids = [post.id for post in posts]
+        # Лайки в архиве не ставятся: счётчик замораживается вместе с
+        # ещё не перенесёнными шардами, сами Like удаляются с постом.
+        pending = pending_likes(post_ids)
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(
+                id=post.id,
+                text=post.text,
+                pub_date=post.pub_date,
+                author_id=post.author_id,
+                group_id=post.group_id,
+                image=post.image.name,
+                like_count=post.like_count + pending[post.id],
+            )
+            for post in posts
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(
+                id=comment.id,
+                post_id=comment.post_id,
+                author_id=comment.author_id,
+                text=comment.text,
+                created=comment.created,
+                parent_id=comment.parent_id,
+                depth=comment.depth,
+                path=comment.path,
+            )
+            for comment in Comment.objects.filter(
+                post_id__in=post_ids
+            ).order_by('path')
+        )
+        # Коллектор получает сами объекты: по флагу обработчики post_delete
+        # отличают перенос в архив от удаления поста.
+        for post in posts:
+            post.archiving = True
+        collector = Collector(using=DEFAULT_DB_ALIAS)
+        collector.collect(posts)
+        collector.delete()
+    cache.delete(ARCHIVE_MAX_ID_KEY)
+    return len(posts)
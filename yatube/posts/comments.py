@@ -0,0 +1,70 @@
+"""Ветки комментариев на материализованном пути.
+
+Путь комментария — id предков от корня и его собственный id, дополненные
+нулями до PATH_SEGMENT_WIDTH знаков и разделённые точкой. Сортировка по
+path даёт обход ветки в глубину, а все ответы страницы корней лежат в
+одном диапазоне индекса (post, path) и читаются одним запросом.
+"""
+from django.conf import settings
+
+PATH_SEGMENT_WIDTH = 10
+PATH_SEPARATOR = '.'
+# Следующий за точкой символ: верхняя граница диапазона путей ветки.
+PATH_UPPER_BOUND = '/'
+
+
+def path_segment(comment_id):
+    return f'{comment_id:0{PATH_SEGMENT_WIDTH}d}'
+
+
+def comment_path(parent, comment_id):
+    if parent is None:
+        return path_segment(comment_id)
+    # У корней, созданных bulk_create, путь не заполнен, он равен их id.
+    prefix = parent.path or path_segment(parent.id)
+    return f'{prefix}{PATH_SEPARATOR}{path_segment(comment_id)}'
+
+
+def reply_parent(parent):
+    """Родитель ответа с учётом COMMENT_MAX_DEPTH.
+
+    Ответ на комментарий самой большой глубины встаёт рядом с ним.
+    """
+    if parent is not None and parent.depth >= settings.COMMENT_MAX_DEPTH:
+        return parent.parent
+    return parent
+
+
+def subtree_range(path):
+    """Границы path всех потомков комментария с путём path."""
+    return path + PATH_SEPARATOR, path + PATH_UPPER_BOUND
+
+
+def root_id(comment):
+    return int(comment.path[:PATH_SEGMENT_WIDTH])
+
+
+def load_threads(queryset, roots):
+    """Корни страницы вперемешку с ответами в порядке обхода веток.
+
+    Ответы всех корней читаются одним запросом по диапазону path и
+    раскладываются по веткам за один проход.
+    """
+    if not roots:
+        return []
+    root_ids = [root.id for root in roots]
+    low, _ = subtree_range(path_segment(min(root_ids)))
+    _, high = subtree_range(path_segment(max(root_ids)))
+    replies = {pk: [] for pk in root_ids}
+    for reply in queryset.filter(
+        depth__gt=0, path__gt=low, path__lt=high
+    ).order_by('path'):
+        # В диапазон попадают и ветки соседних страниц, их пропускаем.
+        thread = replies.get(root_id(reply))
+        if thread is not None:
+            thread.append(reply)
+    comments = []
+    for root in roots:
+        comments.append(root)
+        comments.extend(replies[root.id])
+    return comments
@@ -0,0 +1,18 @@
+from django.utils.functional import SimpleLazyObject
+
+from .unread import get_unread_count, unread_label
+
+
+def feed_unread(request):
+    """Число новых постов в ленте подписок для шапки, например '99+'.
+
+    Ленивое: кеш читается, только если шаблон выводит значение.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'feed_unread': SimpleLazyObject(
+            lambda: unread_label(get_unread_count(user.id))
+        ),
+    }
@@ -0,0 +1,66 @@
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Follow, Post
+
+# Идентификаторы авторов хранятся упакованным массивом беззнаковых int.
+IDS_TYPECODE = 'L'
+
+
+def following_cache_key(user_id):
+    return f'following:{user_id}'
+
+
+def get_following_ids(user_id):
+    """Множество id авторов, на которых подписан пользователь."""
+    key = following_cache_key(user_id)
+    packed = cache.get(key)
+    if packed is None:
+        # Кеш живёт минуты, поэтому заполняем его с primary, а не с реплики.
+        ids = array(IDS_TYPECODE, sorted(
+            Follow.objects.using(DEFAULT_DB_ALIAS).filter(
+                user_id=user_id
+            ).values_list(
+                'author_id', flat=True
+            )
+        ))
+        packed = ids.tobytes()
+        cache.set(key, packed, settings.FOLLOWING_CACHE_TIMEOUT)
+    ids = array(IDS_TYPECODE)
+    ids.frombytes(packed)
+    return frozenset(ids)
+
+
+def invalidate_following(user_id):
+    cache.delete(following_cache_key(user_id))
+
+
+def is_following(user, author_id):
+    if not user.is_authenticated:
+        return False
+    return author_id in get_following_ids(user.id)
+
+
+def follow_statuses(user, author_ids):
+    """Для списка авторов: id тех, на кого подписан user.
+
+    Весь список решается одним чтением кеша (или одним запросом при
+    промахе), сколько бы авторов ни было на странице.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    return get_following_ids(user.id).intersection(author_ids)
+
+
+def following_posts(user_id):
+    """Посты авторов из подписок без JOIN через Follow и auth_user."""
+    author_ids = get_following_ids(user_id)
+    if len(author_ids) > settings.FOLLOWING_IN_LIMIT:
+        # Длинный IN упирается в лимит параметров SQLite.
+        author_ids = Follow.objects.filter(user_id=user_id).values(
+            'author_id'
+        )
+    return Post.objects.filter(author_id__in=author_ids)
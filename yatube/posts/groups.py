@@ -0,0 +1,148 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import ArchivedPost, Group, GroupStats, Post
+
+
+def group_cache_key(slug):
+    return f'group:slug:{slug}'
+
+
+def group_post_count_cache_key(group_id):
+    return f'group:{group_id}:post_count'
+
+
+def get_group(slug):
+    """Группа по slug из кеша; None, если такой группы нет."""
+    key = group_cache_key(slug)
+    group = cache.get(key)
+    if group is None:
+        group = Group.objects.filter(slug=slug).first()
+        if group is not None:
+            cache.set(key, group, settings.GROUP_CACHE_TIMEOUT)
+    return group
+
+
+def get_group_post_count(group_id):
+    key = group_post_count_cache_key(group_id)
+    count = cache.get(key)
+    if count is None:
+        count = Post.objects.filter(group_id=group_id).count()
+        cache.set(key, count, settings.GROUP_CACHE_TIMEOUT)
+    return count
+
+
+def group_posts(group_id):
+    """Лента группы по индексу (group, -pub_date, -id)."""
+    return Post.objects.filter(group_id=group_id).select_related('author')
+
+
+def invalidate_group(*slugs):
+    cache.delete_many([group_cache_key(slug) for slug in slugs if slug])
+
+
+def invalidate_group_post_count(*group_ids):
+    cache.delete_many([
+        group_post_count_cache_key(group_id)
+        for group_id in group_ids if group_id is not None
+    ])
+
+
+def recent_since():
+    """Начало окна, за которое считается posts_last_week."""
+    return timezone.now() - timedelta(days=settings.GROUP_STATS_RECENT_DAYS)
+
+
+def last_post_subquery():
+    return Subquery(
+        Post.objects.filter(group_id=OuterRef('group_id'))
+        .order_by('-pub_date').values('pub_date')[:1]
+    )
+
+
+def group_post_added(group_id, pub_date):
+    """Учитывает пост, появившийся в группе, одним-двумя UPDATE."""
+    changes = {'post_count': F('post_count') + 1}
+    if pub_date >= recent_since():
+        changes['posts_last_week'] = F('posts_last_week') + 1
+    stats = GroupStats.objects.filter(group_id=group_id)
+    if not stats.update(**changes):
+        rebuild_group_stats([group_id])
+        return
+    stats.filter(
+        Q(last_post_at__isnull=True) | Q(last_post_at__lt=pub_date)
+    ).update(last_post_at=pub_date)
+
+
+def group_posts_removed(group_id, pub_dates):
+    """Учитывает посты, удалённые из группы или перенесённые в другую."""
+    since = recent_since()
+    recent = sum(1 for pub_date in pub_dates if pub_date >= since)
+    changes = {'post_count': F('post_count') - len(pub_dates)}
+    if recent:
+        changes['posts_last_week'] = F('posts_last_week') - recent
+    stats = GroupStats.objects.filter(group_id=group_id)
+    stats.update(**changes)
+    # Дата последнего поста пересчитывается, только если ушёл он сам.
+    stats.filter(last_post_at__lte=max(pub_dates)).update(
+        last_post_at=last_post_subquery()
+    )
+
+
+def archived_group_stats(groups):
+    """group_id -> (число постов, последний пост) по архиву групп."""
+    rows = ArchivedPost.objects.filter(group__in=groups).order_by().values(
+        'group_id'
+    ).annotate(
+        post_count=Count('id'), last_post_at=Max('pub_date')
+    ).values_list('group_id', 'post_count', 'last_post_at')
+    return {group_id: (count, last) for group_id, count, last in rows}
+
+
+def rebuild_group_stats(group_ids=None):
+    """Пересчитывает сводку с нуля GROUP BY по постам и по архиву.
+
+    Без аргумента обрабатывает все группы; заодно обновляет
+    posts_last_week, из которого со временем выпадают старые посты.
+    Посты архива входят в post_count, см. posts.archive.
+    """
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    archived = archived_group_stats(groups)
+    rows = groups.annotate(
+        post_count=Count('post_group'),
+        last_post_at=Max('post_group__pub_date'),
+        posts_last_week=Count(
+            'post_group',
+            filter=Q(post_group__pub_date__gte=recent_since()),
+        ),
+    ).values_list('pk', 'post_count', 'last_post_at', 'posts_last_week')
+    stats = []
+    for pk, post_count, last_post_at, posts_last_week in rows:
+        archived_count, archived_last = archived.get(pk, (0, None))
+        stats.append(GroupStats(
+            group_id=pk,
+            post_count=post_count + archived_count,
+            last_post_at=last_post_at or archived_last,
+            posts_last_week=posts_last_week,
+        ))
+    with transaction.atomic():
+        existing = GroupStats.objects.all()
+        if group_ids is not None:
+            existing = existing.filter(group_id__in=group_ids)
+        existing.delete()
+        GroupStats.objects.bulk_create(stats)
+    return len(stats)
+
+
+def group_directory():
+    """Каталог групп: один запрос по индексу last_post_at."""
+    return GroupStats.objects.select_related('group').order_by(
+        F('last_post_at').desc(nulls_last=True), 'group__title'
+    )
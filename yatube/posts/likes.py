@@ -0,0 +1,107 @@
+"""Лайки со счётчиком, разнесённым по шардам.
+
+Лайк пишет строку Like и меняет на ±1 случайный шард LikeCounterShard
+поста. Post.like_count не трогается на каждый лайк: команда
+aggregate_likes периодически переносит в него накопленные приращения.
+"""
+import random
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Like, LikeCounterShard, Post
+
+
+def bump_counter(post_id, delta):
+    shard = random.randrange(settings.LIKE_COUNTER_SHARDS)
+    shards = LikeCounterShard.objects.filter(post_id=post_id, shard=shard)
+    if shards.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            LikeCounterShard.objects.create(
+                post_id=post_id, shard=shard, count=delta
+            )
+    except IntegrityError:
+        shards.update(count=F('count') + delta)
+
+
+def like(user_id, post_id):
+    """Ставит лайк; False, если он уже стоял."""
+    try:
+        with transaction.atomic():
+            Like.objects.create(user_id=user_id, post_id=post_id)
+            bump_counter(post_id, 1)
+    except IntegrityError:
+        return False
+    return True
+
+
+def unlike(user_id, post_id):
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(
+            user_id=user_id, post_id=post_id
+        ).delete()
+        if deleted:
+            bump_counter(post_id, -1)
+    return bool(deleted)
+
+
+def likes_removed(post_ids):
+    """Учитывает лайки, удалённые в обход unlike(), по одному на post_id."""
+    removed = defaultdict(int)
+    for post_id in post_ids:
+        removed[post_id] += 1
+    for post_id, count in removed.items():
+        bump_counter(post_id, -count)
+
+
+def liked_post_ids(user, posts):
+    """Id постов страницы, которые лайкнул user, одним запросом."""
+    post_ids = [post.id for post in posts if not post.is_archived]
+    if not user.is_authenticated or not post_ids:
+        return frozenset()
+    return frozenset(Like.objects.filter(
+        user_id=user.id, post_id__in=post_ids
+    ).values_list('post_id', flat=True))
+
+
+def aggregate_chunk(chunk_size):
+    """Переносит в Post.like_count до chunk_size ненулевых шардов.
+
+    Из шарда вычитается прочитанное значение, а не обнуляется: лайк,
+    пришедший между чтением и записью, не теряется. Возвращает число
+    перенесённых шардов.
+    """
+    with transaction.atomic():
+        shards = list(
+            LikeCounterShard.objects.exclude(count=0).order_by(
+                'pk'
+            ).values_list('pk', 'post_id', 'count')[:chunk_size]
+        )
+        totals = defaultdict(int)
+        by_count = defaultdict(list)
+        for pk, post_id, count in shards:
+            totals[post_id] += count
+            by_count[count].append(pk)
+        for count, pks in by_count.items():
+            LikeCounterShard.objects.filter(pk__in=pks).update(
+                count=F('count') - count
+            )
+        for post_id, total in totals.items():
+            Post.objects.filter(pk=post_id).update(
+                like_count=F('like_count') + total
+            )
+    return len(shards)
+
+
+def pending_likes(post_ids):
+    """Ещё не перенесённые приращения счётчиков: {post_id: сумма}."""
+    totals = defaultdict(int)
+    for post_id, count in LikeCounterShard.objects.filter(
+        post_id__in=post_ids
+    ).values_list('post_id', 'count'):
+        totals[post_id] += count
+    return totals
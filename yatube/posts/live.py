@@ -0,0 +1,179 @@
+"""Живая лента подписок: fanout новых постов по открытым соединениям.
+
+Процесс, где создан пост, сразу раздаёт его своим подписчикам и пишет
+LiveEvent; остальные процессы забирают такие строки фоновым реле.
+"""
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import LiveEvent
+
+logger = logging.getLogger(__name__)
+
+
+def origin():
+    """Имя процесса; считается при вызове, чтобы отличать форки."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def event_message(event):
+    return {
+        'id': event.pk,
+        'post_id': event.post_id,
+        'author_id': event.author_id,
+    }
+
+
+class Subscription:
+    """Очередь событий одного соединения, не длиннее LIVE_QUEUE_SIZE.
+
+    Если клиент не успевает читать, новые события отбрасываются, а
+    overflowed сообщает потоку, что клиенту пора перечитать ленту.
+    """
+
+    def __init__(self, author_ids):
+        self.author_ids = frozenset(author_ids)
+        self.events = queue.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, message):
+        try:
+            self.events.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Следующее событие; queue.Empty, если за timeout ничего нет."""
+        return self.events.get(timeout=timeout)
+
+    def drain(self):
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                break
+        self.overflowed = False
+
+
+class Relay(threading.Thread):
+    """Пересылает в хаб события, опубликованные другими процессами."""
+
+    def __init__(self, hub):
+        super().__init__(name='live-relay', daemon=True)
+        self.hub = hub
+        self.pid = os.getpid()
+        self.last_id = None
+
+    def run(self):
+        while True:
+            close_old_connections()
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception('Ошибка реле живой ленты')
+            time.sleep(settings.LIVE_POLL_INTERVAL)
+
+    def poll_once(self):
+        """Раздаёт новые чужие события; возвращает их число."""
+        if self.last_id is None:
+            # История до запуска реле не нужна: её отдаёт Last-Event-ID.
+            self.last_id = LiveEvent.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            ).first() or 0
+        events = list(
+            LiveEvent.objects.filter(pk__gt=self.last_id).order_by('pk')
+        )
+        own = origin()
+        relayed = 0
+        for event in events:
+            self.last_id = event.pk
+            if event.origin != own:
+                self.hub.publish(event_message(event))
+                relayed += 1
+        self.hub.maybe_prune()
+        return relayed
+
+
+class LiveHub:
+    """Подписчики текущего процесса и их фильтры по авторам."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+        self.relay = None
+        self.next_prune = 0
+
+    def subscribe(self, author_ids):
+        if settings.LIVE_RELAY:
+            self.start_relay()
+        subscription = Subscription(author_ids)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, message):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            if message['author_id'] in subscription.author_ids:
+                subscription.put(message)
+
+    def start_relay(self):
+        with self.lock:
+            # После fork поток реле родителя в процессе не существует.
+            if self.relay is not None and self.relay.pid == os.getpid():
+                return
+            self.relay = Relay(self)
+        self.relay.start()
+
+    def maybe_prune(self):
+        """Удаляет старые LiveEvent не чаще раза в LIVE_EVENT_TTL.
+
+        Вызывается и реле, и при публикации поста, так что таблица
+        чистится даже без подписчиков и с выключенным LIVE_RELAY.
+        """
+        with self.lock:
+            if time.monotonic() < self.next_prune:
+                return
+            self.next_prune = time.monotonic() + settings.LIVE_EVENT_TTL
+        prune_events()
+
+
+hub = LiveHub()
+
+
+def publish_post(post):
+    event = LiveEvent.objects.create(
+        origin=origin(), author_id=post.author_id, post_id=post.pk
+    )
+    hub.publish(event_message(event))
+    hub.maybe_prune()
+
+
+def missed_events(author_ids, last_event_id):
+    """События после Last-Event-ID для переподключившегося клиента."""
+    events = LiveEvent.objects.filter(
+        pk__gt=last_event_id, author_id__in=author_ids
+    ).order_by('pk')[:settings.LIVE_QUEUE_SIZE]
+    return [event_message(event) for event in events]
+
+
+def prune_events():
+    LiveEvent.objects.filter(
+        created__lt=timezone.now() - timedelta(
+            seconds=settings.LIVE_EVENT_TTL
+        )
+    ).delete()
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.likes import aggregate_chunk
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит приращения шардов счётчиков лайков в Post.like_count '
+        'порциями по --chunk-size шардов. Запускается по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.LIKE_AGGREGATE_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            moved = aggregate_chunk(options['chunk_size'])
+            if not moved:
+                break
+            total += moved
+        self.stdout.write(f'Перенесено шардов: {total}')
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_chunk
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше --days дней вместе с комментариями в '
+        'архивные таблицы порциями по --chunk-size. Посты остаются в '
+        'сводке групп, уведомления о них — во входящих; лайки '
+        'замораживаются в счётчике поста, рейтинг «Популярного» удаляется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.ARCHIVE_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        total = 0
+        while True:
+            moved = archive_chunk(before, options['chunk_size'])
+            if not moved:
+                break
+            total += moved
+        self.stdout.write(f'Перенесено в архив постов: {total}')
@@ -0,0 +1,126 @@
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import get_sqlite_pragmas
+
+SCHEMA = (
+    'CREATE TABLE post ('
+    'id INTEGER PRIMARY KEY, like_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE TABLE post_like ('
+    'user_id INTEGER NOT NULL, post_id INTEGER NOT NULL, '
+    'UNIQUE (user_id, post_id))',
+    'CREATE TABLE like_counter_shard ('
+    'post_id INTEGER NOT NULL, shard INTEGER NOT NULL, '
+    'count INTEGER NOT NULL, UNIQUE (post_id, shard))',
+    'INSERT INTO post (id) VALUES (1)',
+)
+LIKE_QUERY = 'INSERT INTO post_like (user_id, post_id) VALUES (?, 1)'
+SINGLE_QUERY = 'UPDATE post SET like_count = like_count + 1 WHERE id = 1'
+SHARD_QUERY = (
+    'INSERT INTO like_counter_shard (post_id, shard, count) VALUES (1, ?, 1) '
+    'ON CONFLICT (post_id, shard) DO UPDATE SET count = count + 1'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность лайков одного популярного поста: '
+        'счётчик в строке поста против шардов LikeCounterShard.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=3.0)
+        parser.add_argument(
+            '--shards', type=int, default=settings.LIKE_COUNTER_SHARDS
+        )
+
+    def handle(self, *args, **options):
+        for mode in ('single', 'sharded'):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.prepare(path)
+                likes, errors = self.run(path, mode, options)
+                total = self.total(path, mode)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{mode:>8}: {likes / seconds:8.0f} лайков/с '
+                f'ошибок блокировки: {errors}, итог счётчика: {total}'
+            )
+
+    def connect(self, path):
+        connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        for name, value in get_sqlite_pragmas().items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def prepare(self, path):
+        connection = self.connect(path)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.close()
+
+    def total(self, path, mode):
+        connection = self.connect(path)
+        query = (
+            'SELECT like_count FROM post' if mode == 'single'
+            else 'SELECT COALESCE(SUM(count), 0) FROM like_counter_shard'
+        )
+        total = connection.execute(query).fetchone()[0]
+        connection.close()
+        return total
+
+    def worker(self, path, mode, shards, deadline, user_ids, counters,
+               lock):
+        connection = self.connect(path)
+        while time.monotonic() < deadline:
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(LIKE_QUERY, (next(user_ids),))
+                if mode == 'single':
+                    connection.execute(SINGLE_QUERY)
+                else:
+                    connection.execute(
+                        SHARD_QUERY, (random.randrange(shards),)
+                    )
+                connection.execute('COMMIT')
+            except sqlite3.OperationalError:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                result = 'errors'
+            else:
+                result = 'likes'
+            with lock:
+                counters[result] += 1
+        connection.close()
+
+    def run(self, path, mode, options):
+        counters = {'likes': 0, 'errors': 0}
+        lock = threading.Lock()
+        # itertools.count потокобезопасен в CPython: id лайкающих не
+        # повторяются, и уникальный индекс лайка не срабатывает.
+        user_ids = itertools.count(1)
+        deadline = time.monotonic() + options['seconds']
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(path, mode, options['shards'], deadline, user_ids,
+                      counters, lock),
+            )
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counters['likes'], counters['errors']
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.benchmark import benchmark_database, format_timing, measure
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+PAGES = (
+    ('posts:index', 'posts/index.html'),
+    ('posts:profile', 'posts/profile.html'),
+    ('posts:post_detail', 'posts/post_detail.html'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга лент и страницы поста шаблонами '
+        'Django и Jinja2: только шаблон и запрос целиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=300)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            post, reader = self.seed()
+            client = Client()
+            client.force_login(reader)
+            args = {
+                'posts:index': (),
+                'posts:profile': (post.author.username,),
+                'posts:post_detail': (post.id,),
+            }
+            for view_name, template_name in PAGES:
+                url = reverse(view_name, args=args[view_name])
+                response = client.get(url)
+                context = response.context[0].flatten()
+                request = response.wsgi_request
+                for engine in ('django', 'jinja2'):
+                    template = engines[engine].get_template(template_name)
+                    timing = measure(
+                        lambda: template.render(context, request),
+                        options['iterations'],
+                    )
+                    self.stdout.write(
+                        format_timing(f'{template_name} {engine}', timing)
+                    )
+                for engine, views in (('django', []), ('jinja2', [view_name])):
+                    with override_settings(JINJA2_VIEWS=views):
+                        timing = measure(
+                            lambda: client.get(url), options['iterations']
+                        )
+                    self.stdout.write(
+                        format_timing(f'{url} {engine}', timing)
+                    )
+
+    def seed(self):
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=author)
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=author) for i in range(50)
+        )
+        post = Post.objects.latest('id')
+        Comment.objects.bulk_create(
+            Comment(post=post, author=reader, text=f'Комментарий {i}')
+            for i in range(50)
+        )
+        return post, reader
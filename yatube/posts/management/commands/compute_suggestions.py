@@ -0,0 +1,65 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from posts.models import FollowGraphChange
+from posts.suggestions import compute_chunk, save_chunk, users_to_update
+
+User = get_user_model()
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации «кого почитать». С --incremental '
+        'обрабатывает только пользователей, чьи подписки изменились.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--top-k', type=int, default=settings.FOLLOW_SUGGESTIONS_TOP_K
+        )
+
+    def handle(self, *args, **options):
+        started = timezone.now()
+        if options['incremental']:
+            user_ids = sorted(users_to_update())
+        else:
+            user_ids = list(
+                User.objects.order_by('id').values_list('id', flat=True)
+            )
+        chunks = list(chunked(user_ids, options['chunk_size']))
+        compute = partial(compute_chunk, top_k=options['top_k'])
+        if options['workers'] <= 1 or len(chunks) <= 1:
+            self.save(chunks, map(compute, chunks))
+        else:
+            # Дочерние процессы не должны унаследовать открытые соединения.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('fork'),
+            )
+            with executor:
+                self.save(chunks, executor.map(compute, chunks))
+        # Изменения, пришедшие во время расчёта, останутся на следующий раз.
+        FollowGraphChange.objects.filter(changed__lte=started).delete()
+
+    def save(self, chunks, results):
+        done = 0
+        for chunk, rows in zip(chunks, results):
+            save_chunk(chunk, rows)
+            done += len(chunk)
+            self.stdout.write(f'Обработано пользователей: {done}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import prune_scores
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет остывшие посты из ленты «Популярное». Запускается по '
+        'расписанию; рейтинги оставшихся постов не меняются.'
+    )
+
+    def handle(self, *args, **options):
+        removed = prune_scores()
+        self.stdout.write(f'Удалено остывших: {removed}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.groups import rebuild_group_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сводку каталога групп. Запускается по расписанию, '
+        'чтобы из «постов за неделю» выпадали старые посты.'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_group_stats()
+        self.stdout.write(f'Обновлена статистика групп: {count}')
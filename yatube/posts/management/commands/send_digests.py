@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет дайджесты неотправленных уведомлений о комментариях: '
+        'одно письмо на получателя, пачками по --batch-size через одно '
+        'соединение EMAIL_BACKEND. Запускается по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.DIGEST_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        sent = send_digests(options['batch_size'])
+        self.stdout.write(f'Отправлено писем: {sent}')
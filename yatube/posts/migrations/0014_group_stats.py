@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:41
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    week_ago = timezone.now() - timedelta(days=7)
+    rows = Group.objects.annotate(
+        post_count=Count('post_group'),
+        last_post_at=Max('post_group__pub_date'),
+        posts_last_week=Count(
+            'post_group', filter=Q(post_group__pub_date__gte=week_ago)
+        ),
+    ).values_list('pk', 'post_count', 'last_post_at', 'posts_last_week')
+    GroupStats.objects.bulk_create(
+        GroupStats(
+            group_id=pk,
+            post_count=post_count,
+            last_post_at=last_post_at,
+            posts_last_week=posts_last_week,
+        )
+        for pk, post_count, last_post_at, posts_last_week in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_group_pub_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('post_count', models.IntegerField(default=0, verbose_name='Всего постов')),
+                ('last_post_at', models.DateTimeField(blank=True, null=True, verbose_name='Последний пост')),
+                ('posts_last_week', models.IntegerField(default=0, verbose_name='Постов за неделю')),
+            ],
+            options={
+                'verbose_name': 'Статистика группы',
+                'verbose_name_plural': 'Статистика групп',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='groupstats',
+            index=models.Index(fields=['-last_post_at'], name='group_stats_last_post_idx'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_post_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origin', models.CharField(max_length=255, verbose_name='Процесс')),
+                ('author_id', models.IntegerField(verbose_name='Автор')),
+                ('post_id', models.IntegerField(verbose_name='Пост')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата события')),
+            ],
+            options={
+                'verbose_name': 'Событие живой ленты',
+                'verbose_name_plural': 'События живой ленты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='liveevent',
+            index=models.Index(fields=['created'], name='live_event_created_idx'),
+        ),
+    ]
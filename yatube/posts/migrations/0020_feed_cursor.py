@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0019_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedCursor',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_cursor', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('last_seen_post_id', models.IntegerField(default=0, verbose_name='Последний просмотренный пост')),
+                ('unread', models.PositiveIntegerField(default=0, verbose_name='Новых постов')),
+            ],
+            options={
+                'verbose_name': 'Отметка ленты подписок',
+                'verbose_name_plural': 'Отметки ленты подписок',
+            },
+        ),
+    ]
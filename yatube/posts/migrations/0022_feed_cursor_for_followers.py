@@ -0,0 +1,34 @@
+from django.db import migrations
+from django.db.models import Max
+
+
+def create_follower_cursors(apps, schema_editor):
+    # Раньше отметку заводила шапка при первом визите; теперь подписка,
+    # поэтому подписчикам без отметки она создаётся здесь.
+    FeedCursor = apps.get_model('posts', 'FeedCursor')
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    last_post_id = Post.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+    user_ids = Follow.objects.exclude(
+        user_id__in=FeedCursor.objects.values('user_id')
+    ).values_list('user_id', flat=True).distinct()
+    FeedCursor.objects.bulk_create(
+        (
+            FeedCursor(user_id=user_id, last_seen_post_id=last_post_id)
+            for user_id in user_ids.iterator()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_notifications'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            create_follower_cursors, migrations.RunPython.noop
+        ),
+    ]
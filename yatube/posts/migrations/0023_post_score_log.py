@@ -0,0 +1,27 @@
+import math
+import time
+
+from django.conf import settings
+from django.db import migrations
+
+
+def scores_to_log(apps, schema_editor):
+    # Рейтинг на момент миграции переводится в логарифм со сдвигом по
+    # времени, см. posts.trending.
+    PostScore = apps.get_model('posts', 'PostScore')
+    offset = time.time() * math.log(2) / settings.TRENDING_HALF_LIFE
+    PostScore.objects.filter(score__lte=0).delete()
+    for score in PostScore.objects.iterator():
+        score.score = math.log(score.score) + offset
+        score.save(update_fields=['score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0022_feed_cursor_for_followers'),
+    ]
+
+    operations = [
+        migrations.RunPython(scores_to_log, migrations.RunPython.noop),
+    ]
@@ -10,11 +10,20 @@ class Group(models.Model):
     slug = models.SlugField(unique=True)
     description = models.TextField()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Прежний slug нужен сигналам, чтобы сбросить кеш и по нему.
+        instance._loaded_slug = instance.__dict__.get('slug')
+        return instance
+
     def __str__(self):
         return self.title
 
 
 class Post(models.Model):
+    is_archived = False
+
     text = models.TextField(
         'Текст поста',
         help_text='Введите текст поста'
@@ -39,9 +48,31 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    # Сумма шардов LikeCounterShard, переносит команда aggregate_likes.
+    like_count = models.IntegerField('Лайки', default=0, editable=False)
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Прежняя группа нужна сигналам, чтобы пересчитать обе группы.
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        return instance
 
     def __str__(self):
         return self.text[:15]
@@ -73,10 +104,34 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        blank=True, null=True,
+        related_name='replies',
+        verbose_name='Ответ на'
+    )
+
+    depth = models.PositiveSmallIntegerField('Глубина', default=0)
+
+    # Путь от корня ветки: id предков и свой через точку, см. posts.comments.
+    path = models.CharField('Путь в ветке', max_length=255, blank=True)
+
+    is_archived = False
+
     class Meta:
         ordering = ['-created']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx'
+            ),
+            models.Index(
+                fields=['post', 'path'], name='comment_post_path_idx'
+            ),
+        ]
 
     def str(self):
         return self.text
@@ -106,3 +161,348 @@ class Follow(models.Model):
     # А как вообще может быть дубликат,
     # если после подписки кнопка меняется
     # и подписаться второй раз нельзя
+
+
+class FollowSuggestion(models.Model):
+    """Готовые рекомендации «кого почитать», считает compute_suggestions."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+        verbose_name='Пользователь'
+    )
+    candidate = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендуемый автор'
+    )
+    score = models.FloatField('Вес')
+
+    class Meta:
+        ordering = ['-score']
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'candidate'],
+                name='unique_follow_suggestion'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score'], name='suggestion_user_score_idx'
+            ),
+        ]
+
+
+class FollowGraphChange(models.Model):
+    """Пользователи, чьи подписки менялись после расчёта рекомендаций.
+
+    Без внешнего ключа: отметка пишется из сигнала удаления Follow, в том
+    числе когда удаляют самого пользователя.
+    """
+
+    user_id = models.IntegerField('Пользователь', primary_key=True)
+    changed = models.DateTimeField('Дата изменения', auto_now=True)
+
+
+class GroupStats(models.Model):
+    """Сводка по группе для каталога групп, ведётся сигналами постов."""
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа'
+    )
+    post_count = models.IntegerField('Всего постов', default=0)
+    last_post_at = models.DateTimeField(
+        'Последний пост', null=True, blank=True
+    )
+    posts_last_week = models.IntegerField('Постов за неделю', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+        indexes = [
+            models.Index(
+                fields=['-last_post_at'], name='group_stats_last_post_idx'
+            ),
+        ]
+
+
+class PostScore(models.Model):
+    """Рейтинг поста для ленты «Популярное».
+
+    Растёт с каждым комментарием, и свежие комментарии весят больше
+    старых, поэтому выше оказываются посты, которые обсуждают прямо
+    сейчас. score — логарифм рейтинга со сдвигом по времени, см.
+    posts.trending.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+        verbose_name='Пост'
+    )
+    score = models.FloatField('Рейтинг', default=0)
+
+    class Meta:
+        verbose_name = 'Рейтинг поста'
+        verbose_name_plural = 'Рейтинги постов'
+        indexes = [
+            models.Index(fields=['-score', '-post'], name='post_score_idx'),
+        ]
+
+
+class LiveEvent(models.Model):
+    """Публикация поста для живой ленты, общая для всех процессов.
+
+    Каждый процесс пересылает подписчикам строки, записанные другими
+    процессами, см. posts.live.Relay. Старые строки удаляются.
+    """
+
+    origin = models.CharField('Процесс', max_length=255)
+    author_id = models.IntegerField('Автор')
+    post_id = models.IntegerField('Пост')
+    created = models.DateTimeField('Дата события', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Событие живой ленты'
+        verbose_name_plural = 'События живой ленты'
+        indexes = [
+            models.Index(fields=['created'], name='live_event_created_idx'),
+        ]
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый из Post командой archive_posts.
+
+    id совпадает с id исходного поста; архив только для чтения.
+    """
+
+    is_archived = True
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    pub_date = models.DateTimeField('Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        blank=True, null=True,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    like_count = models.IntegerField('Лайки', default=0)
+    archived = models.DateTimeField('Дата архивации', auto_now_add=True)
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Пост в архиве'
+        verbose_name_plural = 'Посты в архиве'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='archived_post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='archived_post_author_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='archived_post_group_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий к посту из архива, id совпадает с исходным."""
+
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор'
+    )
+    text = models.TextField('Текст комментария')
+    created = models.DateTimeField('Дата публикации')
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        blank=True, null=True,
+        related_name='replies',
+        verbose_name='Ответ на'
+    )
+    depth = models.PositiveSmallIntegerField('Глубина', default=0)
+    path = models.CharField('Путь в ветке', max_length=255, blank=True)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Комментарий в архиве'
+        verbose_name_plural = 'Комментарии в архиве'
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='archived_comment_post_idx'
+            ),
+            models.Index(
+                fields=['post', 'path'],
+                name='archived_comment_path_idx'
+            ),
+        ]
+
+
+class Like(models.Model):
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Лайк'
+        verbose_name_plural = 'Лайки'
+        constraints = [
+            UniqueConstraint(fields=['user', 'post'], name='unique_like'),
+        ]
+
+
+class LikeCounterShard(models.Model):
+    """Приращение счётчика лайков поста, разнесённое по шардам.
+
+    Лайк меняет случайную из LIKE_COUNTER_SHARDS строк, а не Post, поэтому
+    лайки популярного поста не ждут друг друга на одной строке.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='like_shards',
+        verbose_name='Пост'
+    )
+    shard = models.PositiveSmallIntegerField('Шард')
+    count = models.IntegerField('Приращение', default=0)
+
+    class Meta:
+        verbose_name = 'Шард счётчика лайков'
+        verbose_name_plural = 'Шарды счётчиков лайков'
+        constraints = [
+            UniqueConstraint(
+                fields=['post', 'shard'], name='unique_like_counter_shard'
+            ),
+        ]
+
+
+class FeedCursor(models.Model):
+    """Отметка последнего просмотра ленты подписок и число новых постов.
+
+    unread растёт на единицу с каждым постом автора из подписок, но не
+    дальше FEED_UNREAD_CAP + 1, и сбрасывается при открытии ленты.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_cursor',
+        verbose_name='Пользователь'
+    )
+    last_seen_post_id = models.IntegerField(
+        'Последний просмотренный пост', default=0
+    )
+    unread = models.PositiveIntegerField('Новых постов', default=0)
+
+    class Meta:
+        verbose_name = 'Отметка ленты подписок'
+        verbose_name_plural = 'Отметки ленты подписок'
+
+
+class Notification(models.Model):
+    """Уведомление о комментарии для входящих и письма-дайджеста.
+
+    Комментарий хранится id и отрывком текста без внешнего ключа:
+    уведомление переживает удаление ветки ответов. Ключ поста без
+    ограничения в базе: после archive_posts он указывает на ArchivedPost
+    с тем же id, см. posts.notifications.attach_post_texts.
+    """
+
+    COMMENT = 'comment'
+    REPLY = 'reply'
+    KINDS = (
+        (COMMENT, 'Комментарий к посту'),
+        (REPLY, 'Ответ на комментарий'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор комментария'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='notifications',
+        verbose_name='Пост'
+    )
+    kind = models.CharField('Тип', max_length=16, choices=KINDS)
+    comment_id = models.IntegerField('Комментарий')
+    text = models.CharField('Отрывок комментария', max_length=200)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+    read = models.BooleanField('Прочитано', default=False)
+    emailed = models.BooleanField('Отправлено в дайджесте', default=False)
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        indexes = [
+            models.Index(
+                fields=['recipient', '-created'],
+                name='notification_inbox_idx'
+            ),
+            models.Index(
+                fields=['emailed', 'recipient'],
+                name='notification_digest_idx'
+            ),
+        ]
@@ -0,0 +1,138 @@
+"""Уведомления о комментариях: входящие и письма-дайджесты.
+
+add_comment пишет уведомления одним bulk_create, письма не шлёт.
+Команда send_digests собирает неотправленные уведомления по
+получателям и отправляет дайджесты пачками через одно соединение.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template import defaultfilters, loader
+
+from .models import ArchivedPost, Notification, Post
+
+EXCERPT_LENGTH = 200
+
+
+def notify_comment(comment, post, parent=None):
+    """Уведомляет автора поста и автора комментария, на который ответили."""
+    excerpt = defaultfilters.truncatechars(comment.text, EXCERPT_LENGTH)
+    recipients = {}
+    if parent is not None:
+        recipients[parent.author_id] = Notification.REPLY
+    recipients.setdefault(post.author_id, Notification.COMMENT)
+    recipients.pop(comment.author_id, None)
+    Notification.objects.bulk_create(
+        Notification(
+            recipient_id=recipient_id,
+            actor_id=comment.author_id,
+            post_id=post.id,
+            kind=kind,
+            comment_id=comment.id,
+            text=excerpt,
+        )
+        for recipient_id, kind in recipients.items()
+    )
+
+
+def attach_post_texts(notifications):
+    """Проставляет post_text: пост ищется в Post, а затем в архиве.
+
+    Уведомление переживает перенос поста в архив, поэтому пост не
+    подтягивается select_related. Не больше двух запросов на список.
+    """
+    post_ids = {notification.post_id for notification in notifications}
+    texts = dict(
+        Post.objects.filter(pk__in=post_ids).values_list('id', 'text')
+    )
+    missing = post_ids - texts.keys()
+    if missing:
+        texts.update(
+            ArchivedPost.objects.filter(pk__in=missing).values_list(
+                'id', 'text'
+            )
+        )
+    for notification in notifications:
+        notification.post_text = texts.get(notification.post_id, '')
+    return notifications
+
+
+def pending_recipients(after, limit):
+    return list(
+        Notification.objects.filter(
+            emailed=False, recipient_id__gt=after
+        ).order_by('recipient_id').values_list(
+            'recipient_id', flat=True
+        ).distinct()[:limit]
+    )
+
+
+def digest_message(recipient, notifications, total):
+    body = loader.render_to_string('posts/email/digest.txt', {
+        'recipient': recipient,
+        'notifications': notifications,
+        'more': total - len(notifications),
+    })
+    return EmailMessage(
+        subject=f'Новые комментарии: {total}',
+        body=body,
+        to=[recipient.email],
+    )
+
+
+def build_digests(recipient_ids):
+    """Письма получателям и наибольший id вошедших в них уведомлений.
+
+    В письмо попадают первые DIGEST_MAX_ITEMS уведомлений, остальные
+    только считаются.
+    """
+    limit = settings.DIGEST_MAX_ITEMS
+    notifications = Notification.objects.filter(
+        emailed=False, recipient_id__in=recipient_ids
+    ).select_related('recipient', 'actor').order_by(
+        'recipient_id', 'id'
+    )
+    grouped = {}
+    totals = {}
+    max_id = 0
+    for notification in notifications.iterator():
+        recipient_id = notification.recipient_id
+        items = grouped.setdefault(recipient_id, [])
+        if len(items) < limit:
+            items.append(notification)
+        totals[recipient_id] = totals.get(recipient_id, 0) + 1
+        max_id = max(max_id, notification.id)
+    attach_post_texts([
+        notification for items in grouped.values() for notification in items
+    ])
+    messages = [
+        digest_message(items[0].recipient, items, totals[recipient_id])
+        for recipient_id, items in grouped.items()
+        if items[0].recipient.email
+    ]
+    return messages, max_id
+
+
+def send_digests(batch_size=None):
+    """Рассылает дайджесты; возвращает число отправленных писем.
+
+    Получатели берутся пачками по batch_size, каждая пачка уходит одним
+    send_messages через общее соединение и сразу отмечается отправленной.
+    """
+    batch_size = batch_size or settings.DIGEST_BATCH_SIZE
+    sent = 0
+    after = 0
+    with get_connection() as connection:
+        while True:
+            recipient_ids = pending_recipients(after, batch_size)
+            if not recipient_ids:
+                break
+            messages, max_id = build_digests(recipient_ids)
+            if messages:
+                sent += connection.send_messages(messages) or 0
+            # Пришедшие после чтения уведомления уйдут в следующий раз.
+            Notification.objects.filter(
+                emailed=False, recipient_id__in=recipient_ids,
+                id__lte=max_id,
+            ).update(emailed=True)
+            after = recipient_ids[-1]
+    return sent
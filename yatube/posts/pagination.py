@@ -0,0 +1,67 @@
+import base64
+import binascii
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+CursorPage = namedtuple('CursorPage', ['items', 'next_cursor'])
+
+CURSOR_SEPARATOR = '|'
+
+
+def encode_cursor(value, pk):
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    raw = f'{value}{CURSOR_SEPARATOR}{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Возвращает пару (значение, pk) или None для испорченного курсора."""
+    if not cursor:
+        return None
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit(CURSOR_SEPARATOR, 1)
+        return value, int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def cursor_position(model, field, cursor):
+    """Пара (значение поля, pk) из курсора; None, если курсор испорчен."""
+    position = decode_cursor(cursor)
+    if position is None:
+        return None
+    value, pk = position
+    try:
+        value = model._meta.get_field(field).to_python(value)
+    except ValidationError:
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+def paginate_by_cursor(queryset, field, cursor, limit):
+    """Страница по убыванию (field, pk), начиная после курсора.
+
+    В отличие от Paginator не считает COUNT и не использует OFFSET:
+    запрос всегда идёт по индексу от позиции курсора.
+    """
+    position = cursor_position(queryset.model, field, cursor)
+    if position is not None:
+        value, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{field}__lt': value})
+            | Q(**{field: value, 'pk__lt': pk})
+        )
+    items = list(queryset.order_by(f'-{field}', '-pk')[:limit + 1])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return CursorPage(items, next_cursor)
@@ -0,0 +1,102 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .comments import PATH_SEPARATOR, comment_path
+from .follows import invalidate_following
+from .groups import (
+    group_post_added, group_posts_removed, invalidate_group,
+    invalidate_group_post_count,
+)
+from .models import Comment, Follow, Group, GroupStats, Notification, Post
+from .suggestions import mark_follow_graph_changed
+from .tasks import count_unread_post, generate_thumbnail
+from .thumbnails import get_cached_thumbnail_url
+from .unread import create_cursor, recount_unread
+
+
+@receiver(post_save, sender=Post)
+def precompute_thumbnail(sender, instance, **kwargs):
+    """Ставит в очередь создание миниатюры, чтобы API отдавал готовый URL."""
+    image = instance.image
+    if image and get_cached_thumbnail_url(image) is None:
+        generate_thumbnail.delay(image_name=image.name)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def reset_following(sender, instance, **kwargs):
+    """Сбрасывает кеш подписок, в том числе при правках в админке."""
+    if instance.user_id is not None:
+        invalidate_following(instance.user_id)
+        mark_follow_graph_changed(instance.user_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def reset_feed_unread(sender, instance, **kwargs):
+    if instance.user_id is not None:
+        if kwargs.get('created'):
+            create_cursor(instance.user_id)
+        recount_unread(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_unread(sender, instance, created, **kwargs):
+    if created:
+        count_unread_post.delay(author_id=instance.author_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def reset_group(sender, instance, **kwargs):
+    invalidate_group(instance.slug, getattr(instance, '_loaded_slug', None))
+    invalidate_group_post_count(instance.pk)
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(post_save, sender=Post)
+def update_group_counters(sender, instance, created, **kwargs):
+    """Обновляет счётчики групп, если пост создан или сменил группу."""
+    loaded_group_id = None if created else getattr(
+        instance, '_loaded_group_id', None
+    )
+    if created or loaded_group_id != instance.group_id:
+        invalidate_group_post_count(loaded_group_id, instance.group_id)
+        if loaded_group_id is not None:
+            group_posts_removed(loaded_group_id, [instance.pub_date])
+        if instance.group_id is not None:
+            group_post_added(instance.group_id, instance.pub_date)
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def reset_deleted_post_group(sender, instance, **kwargs):
+    invalidate_group_post_count(instance.group_id)
+    # Пост из архива по-прежнему считается в сводке группы.
+    archiving = getattr(instance, 'archiving', False)
+    if instance.group_id is not None and not archiving:
+        group_posts_removed(instance.group_id, [instance.pub_date])
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_notifications(sender, instance, **kwargs):
+    """У уведомлений нет каскада в базе: после архива они нужны."""
+    if not getattr(instance, 'archiving', False):
+        Notification.objects.filter(post_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Comment)
+def set_comment_path(sender, instance, created, **kwargs):
+    """Путь в ветке известен только после INSERT, когда есть id."""
+    if created and not instance.path:
+        instance.path = comment_path(instance.parent, instance.id)
+        instance.depth = instance.path.count(PATH_SEPARATOR)
+        Comment.objects.filter(pk=instance.pk).update(
+            path=instance.path, depth=instance.depth
+        )
@@ -0,0 +1,113 @@
+"""Рекомендации «кого почитать» по графу подписок.
+
+Кандидаты для пользователя — авторы, на которых подписаны его подписки
+(второй круг), и авторы, пишущие в те же группы, что и он сам. Расчёт
+идёт офлайн командой compute_suggestions, страницы читают готовую
+таблицу FollowSuggestion одним запросом по индексу.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .follows import get_following_ids
+from .models import Follow, FollowGraphChange, FollowSuggestion, Post
+
+FRIEND_OF_FRIEND_WEIGHT = 1.0
+SHARED_GROUP_WEIGHT = 0.5
+
+
+def mark_follow_graph_changed(user_id):
+    now = timezone.now()
+    updated = FollowGraphChange.objects.filter(user_id=user_id).update(
+        changed=now
+    )
+    if not updated:
+        FollowGraphChange.objects.bulk_create(
+            [FollowGraphChange(user_id=user_id, changed=now)],
+            ignore_conflicts=True,
+        )
+
+
+def group_by_first(pairs):
+    result = defaultdict(set)
+    for key, value in pairs:
+        result[key].add(value)
+    return result
+
+
+def compute_chunk(user_ids, top_k):
+    """Список (user_id, candidate_id, score) для пачки пользователей.
+
+    Запускается в отдельном процессе, поэтому сам читает из базы всё
+    нужное для пачки: пять запросов независимо от её размера.
+    """
+    following = group_by_first(Follow.objects.filter(
+        user_id__in=user_ids
+    ).values_list('user_id', 'author_id'))
+    followees = set().union(*following.values())
+    second_degree = group_by_first(Follow.objects.filter(
+        user_id__in=followees
+    ).values_list('user_id', 'author_id'))
+    user_groups = group_by_first(Post.objects.filter(
+        author_id__in=user_ids, group__isnull=False
+    ).values_list('author_id', 'group_id').distinct())
+    groups = set().union(*user_groups.values())
+    group_authors = group_by_first(Post.objects.filter(
+        group_id__in=groups
+    ).values_list('group_id', 'author_id').distinct())
+
+    rows = []
+    for user_id in user_ids:
+        followed = following.get(user_id, set())
+        scores = Counter()
+        for followee in followed:
+            for candidate in second_degree.get(followee, ()):
+                scores[candidate] += FRIEND_OF_FRIEND_WEIGHT
+        for group_id in user_groups.get(user_id, ()):
+            for candidate in group_authors.get(group_id, ()):
+                scores[candidate] += SHARED_GROUP_WEIGHT
+        for excluded in followed | {user_id}:
+            scores.pop(excluded, None)
+        rows.extend(
+            (user_id, candidate, score)
+            for candidate, score in scores.most_common(top_k)
+        )
+    return rows
+
+
+def save_chunk(user_ids, rows):
+    with transaction.atomic():
+        FollowSuggestion.objects.filter(user_id__in=user_ids).delete()
+        FollowSuggestion.objects.bulk_create(
+            FollowSuggestion(user_id=user_id, candidate_id=candidate,
+                             score=score)
+            for user_id, candidate, score in rows
+        )
+
+
+def users_to_update():
+    """Изменившиеся пользователи и их подписчики, чей второй круг сдвинулся."""
+    changed = set(FollowGraphChange.objects.values_list('user_id', flat=True))
+    followers = Follow.objects.filter(
+        author_id__in=changed
+    ).values_list('user_id', flat=True)
+    return changed | (set(followers) - {None})
+
+
+def get_suggestions(user):
+    """Рекомендации для страницы: один запрос по индексу (user, -score).
+
+    Подписки, оформленные после расчёта, отсекаются по кешу подписок.
+    """
+    if not user.is_authenticated:
+        return []
+    suggestions = FollowSuggestion.objects.filter(user=user).select_related(
+        'candidate'
+    )[:settings.FOLLOW_SUGGESTIONS_TOP_K]
+    followed = get_following_ids(user.id)
+    return [
+        suggestion for suggestion in suggestions
+        if suggestion.candidate_id not in followed
+    ]
@@ -0,0 +1,23 @@
+from jobs.queue import task
+
+from .thumbnails import delete_image, thumbnail_url
+from .unread import post_published
+
+
+@task
+def generate_thumbnail(image_name):
+    """Создаёт миниатюру и кладёт её URL в кеш."""
+    thumbnail_url(image_name)
+
+
+@task
+def delete_images(image_names):
+    """Удаляет картинки удалённых постов вместе с миниатюрами."""
+    for name in image_names:
+        delete_image(name)
+
+
+@task
+def count_unread_post(author_id):
+    """Увеличивает счётчики новых постов подписчикам автора."""
+    post_published(author_id)
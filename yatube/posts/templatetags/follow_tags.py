@@ -0,0 +1,18 @@
+from django import template
+
+from ..follows import follow_statuses
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def followed_authors(context, objects):
+    """Id авторов объектов страницы, на которых подписан пользователь.
+
+    {% followed_authors page_obj as followed %}
+    {% if post.author_id in followed %}...{% endif %}
+    """
+    user = context.get('user')
+    if user is None:
+        return frozenset()
+    return follow_statuses(user, {obj.author_id for obj in objects})
@@ -0,0 +1,139 @@
+import os
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.groups import rebuild_group_stats
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Group, GroupStats, Notification,
+    Post,
+)
+
+User = get_user_model()
+
+
+@override_settings(API_PAGE_SIZE=2, COMMENTS_PAGE_SIZE=2)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'post {i}', author=cls.author,
+                group=cls.group if i < 2 else None,
+            )
+            for i in range(4)
+        ]
+        Post.objects.filter(pk__in=[cls.posts[0].pk, cls.posts[1].pk]).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.posts[0], author=cls.author, text=f'comment {i}'
+            )
+        Notification.objects.create(
+            recipient=cls.author, actor=cls.reader, post=cls.posts[0],
+            kind=Notification.COMMENT, comment_id=0, text='comment',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.author)
+        call_command(
+            'archive_posts', chunk_size=1, stdout=open(os.devnull, 'w')
+        )
+
+    def test_old_posts_moved_with_comments(self):
+        self.assertEqual(
+            set(Post.objects.values_list('id', flat=True)),
+            {self.posts[2].id, self.posts[3].id},
+        )
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('id', flat=True)),
+            {self.posts[0].id, self.posts[1].id},
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            ArchivedComment.objects.filter(post_id=self.posts[0].id).count(),
+            3,
+        )
+
+    def test_post_detail_reads_archive(self):
+        post = self.posts[0]
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.id])
+        )
+        self.assertContains(response, post.text)
+        self.assertEqual(len(response.context['comments']), 2)
+        self.assertNotContains(
+            response, reverse('posts:post_edit', args=[post.id])
+        )
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=[post.id])
+        )
+        response = self.client.get(
+            reverse('posts:post_comments', args=[post.id]),
+            {'cursor': response.context['comments_cursor']},
+        )
+        self.assertEqual(len(response.context['comments']), 1)
+
+    def test_api_feed_continues_into_archive(self):
+        url = reverse('api:profile', args=[self.author.username])
+        # Автор, горячая страница и наибольший id архива — без выборки
+        # из самого архива, пока горячие посты не кончились.
+        with self.assertNumQueries(3):
+            data = self.client.get(url).json()
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.posts[3].id, self.posts[2].id],
+        )
+        data = self.client.get(url, {'cursor': data['next_cursor']}).json()
+        self.assertEqual(
+            [post['id'] for post in data['results']],
+            [self.posts[1].id, self.posts[0].id],
+        )
+        self.assertIsNone(data['next_cursor'])
+
+    def test_api_detail_and_batch_read_archive(self):
+        post = self.posts[0]
+        response = self.client.get(reverse('api:post_detail', args=[post.id]))
+        self.assertEqual(response.json()['text'], post.text)
+        response = self.client.get(
+            reverse('api:posts_batch'), {'ids': f'{post.id},0'}
+        )
+        data = response.json()
+        self.assertEqual(data['results'][0]['comments_count'], 3)
+        self.assertEqual(data['not_found'], [0])
+
+    def test_group_stats_keep_archived_posts(self):
+        stats = GroupStats.objects.filter(group=self.group)
+        self.assertEqual(stats.get().post_count, 2)
+        rebuild_group_stats()
+        self.assertEqual(stats.get().post_count, 2)
+
+    def test_deleted_post_drops_notifications(self):
+        Notification.objects.create(
+            recipient=self.author, actor=self.reader, post=self.posts[3],
+            kind=Notification.COMMENT, comment_id=0, text='comment',
+        )
+        Post.objects.filter(pk=self.posts[3].pk).delete()
+        self.assertEqual(
+            list(Notification.objects.values_list('post_id', flat=True)),
+            [self.posts[0].id],
+        )
+
+    def test_notifications_survive_archive(self):
+        response = self.client.get(reverse('posts:notifications'))
+        notifications = list(response.context['page_obj'])
+        self.assertEqual(len(notifications), 1)
+        self.assertContains(response, f'«{self.posts[0].text}»')
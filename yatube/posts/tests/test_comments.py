@@ -0,0 +1,110 @@
+import os
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import ArchivedComment, Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PAGE_SIZE=2, COMMENT_MAX_DEPTH=2)
+class CommentThreadsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='author')
+        self.client.force_login(self.user)
+        self.post = Post.objects.create(text='пост', author=self.user)
+
+    def comment(self, text, parent=None, post=None):
+        post = post or self.post
+        data = {'text': text}
+        if parent is not None:
+            data['parent'] = parent.id
+        self.client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.id}), data
+        )
+        return Comment.objects.get(text=text)
+
+    def texts(self, response):
+        return [
+            (comment.text, comment.depth)
+            for comment in response.context['comments']
+        ]
+
+    def test_reply_gets_path_and_depth(self):
+        root = self.comment('корень')
+        reply = self.comment('ответ', parent=root)
+        self.assertEqual(root.path, f'{root.id:010d}')
+        self.assertEqual(reply.parent, root)
+        self.assertEqual(reply.depth, 1)
+        self.assertEqual(reply.path, f'{root.id:010d}.{reply.id:010d}')
+
+    def test_depth_is_limited(self):
+        root = self.comment('корень')
+        reply = self.comment('ответ', parent=root)
+        deep = self.comment('глубже', parent=reply)
+        deepest = self.comment('ещё глубже', parent=deep)
+        self.assertEqual(deep.depth, 2)
+        self.assertEqual(deepest.depth, 2)
+        self.assertEqual(deepest.parent, reply)
+
+    def test_reply_to_other_post_becomes_root(self):
+        other = Post.objects.create(text='другой', author=self.user)
+        foreign = self.comment('чужой', post=other)
+        reply = self.comment('ответ', parent=foreign)
+        self.assertIsNone(reply.parent)
+        self.assertEqual(reply.depth, 0)
+
+    def test_threads_paginated_by_roots(self):
+        first = self.comment('первый')
+        self.comment('ответ первому', parent=first)
+        second = self.comment('второй')
+        reply = self.comment('ответ второму', parent=second)
+        self.comment('ответ на ответ', parent=reply)
+        self.comment('третий')
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        response = self.client.get(url)
+        self.assertEqual(self.texts(response), [
+            ('третий', 0),
+            ('второй', 0), ('ответ второму', 1), ('ответ на ответ', 2),
+        ])
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.id})
+        # Корни страницы и один диапазонный запрос за ответами.
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                url, {'cursor': response.context['comments_cursor']}
+            )
+        self.assertEqual(
+            self.texts(response), [('первый', 0), ('ответ первому', 1)]
+        )
+
+    def test_archived_threads(self):
+        root = self.comment('корень')
+        self.comment('ответ', parent=root)
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        call_command('archive_posts', stdout=open(os.devnull, 'w'))
+        self.assertEqual(
+            ArchivedComment.objects.get(text='ответ').parent_id, root.id
+        )
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        self.assertEqual(self.texts(response), [('корень', 0), ('ответ', 1)])
+
+    def test_reply_form_carries_parent(self):
+        root = self.comment('корень')
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            {'reply_to': root.id},
+        )
+        self.assertContains(
+            response, f'<input type="hidden" name="parent" value="{root.id}">'
+        )
@@ -0,0 +1,91 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+CSRF_VALUE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]+')
+
+
+def normalize(html):
+    """HTML без различий в пробелах и без случайного CSRF-токена.
+
+    Jinja2 экранирует кавычку как &#34;, Django — как &quot;.
+    """
+    html = CSRF_VALUE.sub(r'\1', html).replace('&#34;', '&quot;')
+    html = re.sub(r'\s+', ' ', html)
+    return re.sub(r'\s*(<|>)\s*', r'\1', html).strip()
+
+
+@override_settings(COMMENTS_PAGE_SIZE=2, PAGINATOR_CONST=3)
+class Jinja2ParityTests(TestCase):
+    maxDiff = None
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', first_name='Имя', last_name='Фамилия'
+        )
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост <b>{i}</b> & "кавычки"', author=cls.author,
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(5)
+        ]
+        for i in range(3):
+            Comment.objects.create(
+                post=cls.posts[0], author=cls.user, text=f'Комментарий {i}'
+            )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def render_both(self, view_name, url):
+        cache.clear()
+        django_response = self.client.get(url)
+        cache.clear()
+        with override_settings(JINJA2_VIEWS=[view_name]):
+            jinja_response = self.client.get(url)
+        self.assertFalse([
+            template.name for template in jinja_response.templates
+            if template.name.startswith('posts/')
+        ])
+        return (
+            normalize(django_response.content.decode()),
+            normalize(jinja_response.content.decode()),
+        )
+
+    def test_ported_views_render_same_html(self):
+        post_id = self.posts[0].id
+        pages = {
+            'posts:index': reverse('posts:index') + '?page=2',
+            'posts:follow_index': reverse('posts:follow_index'),
+            'posts:profile': reverse('posts:profile', args=['author']),
+            'posts:post_detail': reverse(
+                'posts:post_detail', args=[post_id]
+            ),
+            'posts:post_comments': reverse(
+                'posts:post_comments', args=[post_id]
+            ),
+        }
+        for view_name, url in pages.items():
+            with self.subTest(view=view_name):
+                django_html, jinja_html = self.render_both(view_name, url)
+                self.assertEqual(jinja_html, django_html)
+
+    def test_anonymous_profile_renders_same_html(self):
+        self.client.logout()
+        django_html, jinja_html = self.render_both(
+            'posts:profile', reverse('posts:profile', args=['reader'])
+        )
+        self.assertEqual(jinja_html, django_html)
@@ -0,0 +1,100 @@
+import os
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.likes import aggregate_chunk, liked_post_ids
+from posts.models import ArchivedPost, Like, LikeCounterShard, Post
+
+User = get_user_model()
+
+
+@override_settings(LIKE_COUNTER_SHARDS=4)
+class LikesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.users = [
+            User.objects.create_user(username=f'user{i}') for i in range(5)
+        ]
+        self.post = Post.objects.create(text='пост', author=self.author)
+
+    def like(self, user, post=None, action='posts:post_like'):
+        self.client.force_login(user)
+        post = post or self.post
+        return self.client.post(
+            reverse(action, kwargs={'post_id': post.id})
+        )
+
+    def aggregate(self):
+        call_command('aggregate_likes', stdout=open(os.devnull, 'w'))
+        self.post.refresh_from_db()
+
+    def test_like_once_per_user(self):
+        self.like(self.users[0])
+        self.like(self.users[0])
+        self.assertEqual(Like.objects.count(), 1)
+        self.aggregate()
+        self.assertEqual(self.post.like_count, 1)
+
+    def test_counts_aggregated_from_shards(self):
+        for user in self.users:
+            self.like(user)
+        self.like(self.users[0], action='posts:post_unlike')
+        self.assertEqual(self.post.like_count, 0)
+        self.assertLessEqual(
+            LikeCounterShard.objects.filter(post=self.post).count(), 4
+        )
+        self.aggregate()
+        self.assertEqual(self.post.like_count, 4)
+        self.assertFalse(LikeCounterShard.objects.exclude(count=0).exists())
+        self.aggregate()
+        self.assertEqual(self.post.like_count, 4)
+
+    def test_aggregate_in_chunks(self):
+        other = Post.objects.create(text='другой', author=self.author)
+        for user in self.users:
+            self.like(user)
+            self.like(user, post=other)
+        while aggregate_chunk(1):
+            pass
+        self.assertEqual(
+            list(Post.objects.order_by('id').values_list(
+                'like_count', flat=True
+            )),
+            [5, 5],
+        )
+
+    def test_liked_state_in_one_query(self):
+        posts = [self.post] + [
+            Post.objects.create(text=f'пост {i}', author=self.author)
+            for i in range(3)
+        ]
+        self.like(self.users[0], post=posts[1])
+        self.like(self.users[0], post=posts[3])
+        with self.assertNumQueries(1):
+            liked = liked_post_ids(self.users[0], posts)
+        self.assertEqual(liked, {posts[1].id, posts[3].id})
+
+    def test_feed_shows_like_button(self):
+        self.like(self.users[0])
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response,
+            reverse('posts:post_unlike', kwargs={'post_id': self.post.id}),
+        )
+
+    def test_archive_keeps_pending_likes(self):
+        self.like(self.users[0])
+        self.like(self.users[1])
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        call_command('archive_posts', stdout=open(os.devnull, 'w'))
+        self.assertEqual(ArchivedPost.objects.get().like_count, 2)
+        self.assertFalse(Like.objects.exists())
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Notification, Post
+from posts.notifications import send_digests
+
+User = get_user_model()
+
+
+@override_settings(DIGEST_MAX_ITEMS=2)
+class NotificationsTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author', email='author@example.com'
+        )
+        self.reader = User.objects.create_user(
+            username='reader', email='reader@example.com'
+        )
+        self.post = Post.objects.create(text='пост', author=self.author)
+
+    def comment(self, user, text, parent=None):
+        self.client.force_login(user)
+        data = {'text': text}
+        if parent is not None:
+            data['parent'] = parent.id
+        self.client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.id}),
+            data,
+        )
+        return Comment.objects.get(text=text)
+
+    def test_comment_notifies_post_author(self):
+        comment = self.comment(self.reader, 'комментарий')
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, self.author)
+        self.assertEqual(notification.actor, self.reader)
+        self.assertEqual(notification.kind, Notification.COMMENT)
+        self.assertEqual(notification.comment_id, comment.id)
+
+    def test_reply_notifies_parent_author(self):
+        root = self.comment(self.reader, 'вопрос')
+        self.comment(self.author, 'ответ', parent=root)
+        reply = Notification.objects.get(kind=Notification.REPLY)
+        self.assertEqual(reply.recipient, self.reader)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_own_comment_not_notified(self):
+        self.comment(self.author, 'сам себе')
+        self.assertFalse(Notification.objects.exists())
+
+    def test_inbox_marks_read(self):
+        self.comment(self.reader, 'комментарий')
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertContains(response, 'новое')
+        self.assertFalse(Notification.objects.filter(read=False).exists())
+
+    def test_digest_grouped_per_recipient(self):
+        for i in range(3):
+            self.comment(self.reader, f'комментарий {i}')
+        root = Comment.objects.first()
+        self.comment(self.author, 'ответ', parent=root)
+        self.assertEqual(send_digests(batch_size=1), 2)
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['author@example.com', 'reader@example.com'],
+        )
+        digest = next(m for m in mail.outbox if m.to == [self.author.email])
+        self.assertIn('И ещё уведомлений: 1', digest.body)
+        self.assertFalse(Notification.objects.filter(emailed=False).exists())
+        self.assertEqual(send_digests(), 0)
+
+    def test_digest_uses_one_file_connection(self):
+        self.comment(self.reader, 'комментарий')
+        self.comment(self.author, 'ответ', parent=Comment.objects.get())
+        directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+            EMAIL_FILE_PATH=directory,
+        ):
+            call_command(
+                'send_digests', batch_size=1, stdout=open(os.devnull, 'w')
+            )
+        files = os.listdir(directory)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(directory, files[0])) as sent:
+            content = sent.read()
+        self.assertIn('author@example.com', content)
+        self.assertIn('reader@example.com', content)
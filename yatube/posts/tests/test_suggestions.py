@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, FollowGraphChange, FollowSuggestion, Group
+from posts.models import Post
+
+User = get_user_model()
+
+
+class FollowSuggestionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.friend, cls.friend_of_friend, cls.neighbour = [
+            User.objects.create_user(username=f'user{i}') for i in range(4)
+        ]
+        cls.group = Group.objects.create(
+            title='test group', slug='test-slug', description='desc'
+        )
+        Follow.objects.create(user=cls.user, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.friend_of_friend)
+        Post.objects.create(text='text', author=cls.user, group=cls.group)
+        Post.objects.create(
+            text='text', author=cls.neighbour, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def compute(self, *args):
+        call_command(
+            'compute_suggestions', *args, '--workers=1', stdout=StringIO()
+        )
+
+    def candidates(self, user):
+        return list(FollowSuggestion.objects.filter(user=user).values_list(
+            'candidate__username', flat=True
+        ))
+
+    def test_full_run(self):
+        self.compute()
+        self.assertEqual(
+            self.candidates(self.user),
+            [self.friend_of_friend.username, self.neighbour.username],
+        )
+        self.assertFalse(FollowGraphChange.objects.exists())
+
+    def test_incremental_run(self):
+        self.compute()
+        Follow.objects.create(user=self.user, author=self.friend_of_friend)
+        self.assertTrue(
+            FollowGraphChange.objects.filter(user_id=self.user.id).exists()
+        )
+        self.compute('--incremental')
+        self.assertEqual(
+            self.candidates(self.user), [self.neighbour.username]
+        )
+
+    def test_views_show_suggestions(self):
+        self.compute()
+        client = Client()
+        client.force_login(self.user)
+        for url in (
+            reverse('posts:follow_index'),
+            reverse('posts:profile', args=[self.friend.username]),
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(
+                    [s.candidate for s in response.context['suggestions']],
+                    [self.friend_of_friend, self.neighbour],
+                )
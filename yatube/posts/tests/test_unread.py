@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from jobs.queue import run_pending
+from posts.models import FeedCursor, Follow, Post
+from posts.unread import get_unread_count
+
+User = get_user_model()
+
+
+@override_settings(FEED_UNREAD_CAP=3)
+class FeedUnreadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        Post.objects.create(text='старый', author=self.author)
+        run_pending()
+        # Подписка заводит отметку: старые посты новыми не считаются.
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+
+    def publish(self, times=1):
+        for i in range(times):
+            Post.objects.create(text=f'пост {i}', author=self.author)
+        run_pending()
+
+    def badge(self, response):
+        return response.context['feed_unread']
+
+    def test_new_posts_counted(self):
+        self.assertEqual(get_unread_count(self.reader.id), 0)
+        self.publish(2)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(str(self.badge(response)), '2')
+        self.assertContains(response, 'badge bg-danger')
+
+    def test_count_is_capped(self):
+        self.publish(6)
+        self.assertEqual(FeedCursor.objects.get(user=self.reader).unread, 4)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(str(self.badge(response)), '3+')
+
+    def test_follow_feed_resets_count(self):
+        self.publish(2)
+        self.client.get(reverse('posts:follow_index'))
+        cursor = FeedCursor.objects.get(user=self.reader)
+        self.assertEqual(cursor.unread, 0)
+        self.assertEqual(
+            cursor.last_seen_post_id, Post.objects.latest('id').id
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'badge bg-danger')
+
+    def test_follow_creates_cursor(self):
+        cursor = FeedCursor.objects.get(user=self.reader)
+        self.assertEqual(cursor.unread, 0)
+        self.assertEqual(
+            cursor.last_seen_post_id, Post.objects.latest('id').id
+        )
+
+    def test_header_does_not_write(self):
+        stranger = User.objects.create_user(username='stranger')
+        self.client.force_login(stranger)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(str(self.badge(response)), '')
+        self.assertFalse(FeedCursor.objects.filter(user=stranger).exists())
+
+    def test_cached_count_needs_no_queries(self):
+        self.publish()
+        get_unread_count(self.reader.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.reader.id), 1)
+
+    def test_unfollow_recounts(self):
+        self.publish(2)
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(get_unread_count(self.reader.id), 0)
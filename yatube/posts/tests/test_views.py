@@ -1,5 +1,7 @@
+import os
 import tempfile
 import shutil
+import time
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -8,8 +10,14 @@ from django.urls import reverse
 from django.shortcuts import get_object_or_404
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
 
-from posts.models import Post, Group, Follow
+from posts.follows import get_following_ids
+from posts.models import (
+    Comment, Follow, Group, GroupStats, Post, PostScore,
+)
+from posts.trending import current_score, prune_scores
 
 User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -326,3 +334,243 @@ class FollowTests(TestCase):
             reverse('posts:follow_index')
         )
         self.assertNotEqual(response.context['page_obj'], authors_post)
+
+    def test_following_ids_cached_and_invalidated(self):
+        cache.clear()
+        self.assertEqual(get_following_ids(self.user.id), frozenset())
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=[self.user_2.username])
+        )
+        self.assertEqual(get_following_ids(self.user.id), {self.user_2.id})
+        with self.assertNumQueries(0):
+            get_following_ids(self.user.id)
+        Follow.objects.filter(user=self.user).delete()
+        self.assertEqual(get_following_ids(self.user.id), frozenset())
+
+    def test_followed_authors_tag_resolves_page_at_once(self):
+        cache.clear()
+        Follow.objects.create(user=self.user, author=self.user_2)
+        posts = [
+            Post.objects.create(text='text', author=author)
+            for author in (self.user_2, self.user_3, self.user_2)
+        ]
+        cache.clear()
+        template = Template(
+            '{% load follow_tags %}'
+            '{% followed_authors posts as followed %}'
+            '{% for post in posts %}'
+            '{% if post.author_id in followed %}+{% else %}-{% endif %}'
+            '{% endfor %}'
+        )
+        with self.assertNumQueries(1):
+            rendered = template.render(
+                Context({'user': self.user, 'posts': posts})
+            )
+        self.assertEqual(rendered, '+-+')
+
+    def test_profile_follow_state_without_query(self):
+        Follow.objects.create(user=self.user, author=self.user_2)
+        url = reverse('posts:profile', args=[self.user_2.username])
+        response = self.authorized_client.get(url)
+        self.assertTrue(response.context['following'])
+        with self.assertNumQueries(0):
+            get_following_ids(self.user.id)
+
+
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.number_of_comments = settings.COMMENTS_PAGE_SIZE + 5
+        cls.user = User.objects.create_user(username='username')
+        cls.post = Post.objects.create(text='test text', author=cls.user)
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'comment {i}')
+            for i in range(cls.number_of_comments)
+        )
+        # Одинаковое время создания: порядок держится на id.
+        Comment.objects.update(created=cls.post.pub_date)
+
+    def test_post_detail_shows_first_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.COMMENTS_PAGE_SIZE)
+        self.assertEqual(
+            comments[0].text, f'comment {self.number_of_comments - 1}'
+        )
+        self.assertIsNotNone(response.context['comments_cursor'])
+
+    def test_comments_endpoint_returns_next_page(self):
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        cursor = response.context['comments_cursor']
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.id})
+        # Корни страницы и один диапазонный запрос за ответами.
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'cursor': cursor})
+        texts = [comment.text for comment in response.context['comments']]
+        self.assertEqual(texts, [f'comment {i}' for i in range(4, -1, -1)])
+        self.assertIsNone(response.context['comments_cursor'])
+        self.assertTemplateUsed(response, 'posts/includes/comments_list.html')
+
+
+class GroupFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='username')
+        cls.group = Group.objects.create(
+            title='test group',
+            slug='test-slug',
+            description='test group desc'
+        )
+        cls.other_group = Group.objects.create(
+            title='other group',
+            slug='other-slug',
+            description='other group desc'
+        )
+        for group in (cls.group, cls.other_group, None):
+            Post.objects.bulk_create(
+                Post(text='test text', author=cls.user, group=group)
+                for _ in range(3)
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_group_page_contains_only_group_posts(self):
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 3)
+        self.assertTrue(all(post.group == self.group for post in page_obj))
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_group_post_count_follows_post_changes(self):
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        self.client.get(url)
+        post = Post.objects.filter(group=self.other_group).first()
+        post.group = self.group
+        post.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 4)
+        post.delete()
+        response = self.client.get(url)
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+
+
+class GroupDirectoryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='username')
+        cls.group = Group.objects.create(title='first', slug='first')
+        cls.other_group = Group.objects.create(title='second', slug='second')
+        cls.empty_group = Group.objects.create(title='empty', slug='empty')
+
+    def stats_of(self, group):
+        stats = GroupStats.objects.get(group=group)
+        return stats.post_count, stats.posts_last_week, stats.last_post_at
+
+    def test_stats_follow_post_changes(self):
+        first = Post.objects.create(
+            text='first', author=self.user, group=self.group
+        )
+        second = Post.objects.create(
+            text='second', author=self.user, group=self.group
+        )
+        self.assertEqual(
+            self.stats_of(self.group), (2, 2, second.pub_date)
+        )
+        second.group = self.other_group
+        second.save()
+        self.assertEqual(self.stats_of(self.group), (1, 1, first.pub_date))
+        self.assertEqual(
+            self.stats_of(self.other_group), (1, 1, second.pub_date)
+        )
+        first.delete()
+        self.assertEqual(self.stats_of(self.group), (0, 0, None))
+
+    def test_rebuild_matches_incremental_stats(self):
+        for group in (self.group, self.other_group, self.group):
+            Post.objects.create(text='text', author=self.user, group=group)
+        expected = {
+            group: self.stats_of(group)
+            for group in (self.group, self.other_group, self.empty_group)
+        }
+        GroupStats.objects.all().delete()
+        call_command('rebuild_group_stats', stdout=open(os.devnull, 'w'))
+        for group, stats in expected.items():
+            self.assertEqual(self.stats_of(group), stats)
+
+    def test_group_index_single_query(self):
+        Post.objects.create(text='text', author=self.user, group=self.group)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:group_index'))
+        stats = list(response.context['group_stats'])
+        self.assertEqual(
+            [item.group for item in stats],
+            [self.group, self.empty_group, self.other_group]
+        )
+        self.assertContains(response, 'Постов: 1')
+
+
+@override_settings(TRENDING_PAGE_SIZE=2)
+class HotFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='username')
+        cls.posts = [
+            Post.objects.create(text=f'post {i}', author=cls.user)
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def comment(self, post, times=1):
+        url = reverse('posts:add_comment', kwargs={'post_id': post.id})
+        for _ in range(times):
+            self.client.post(url, {'text': 'comment'})
+
+    def test_comments_raise_score(self):
+        self.comment(self.posts[0], times=2)
+        score = PostScore.objects.get(post=self.posts[0]).score
+        self.assertAlmostEqual(current_score(score), 2, places=3)
+        self.assertFalse(PostScore.objects.filter(post=self.posts[1]))
+
+    def test_hot_feed_ordered_and_paginated(self):
+        self.comment(self.posts[1], times=3)
+        self.comment(self.posts[0], times=2)
+        self.comment(self.posts[2])
+        self.client.logout()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:hot_index'))
+        self.assertEqual(
+            response.context['page_obj'], [self.posts[1], self.posts[0]]
+        )
+        response = self.client.get(
+            reverse('posts:hot_index'),
+            {'cursor': response.context['cursor']}
+        )
+        self.assertEqual(response.context['page_obj'], [self.posts[2]])
+        self.assertIsNone(response.context['cursor'])
+
+    @override_settings(TRENDING_HALF_LIFE=60, TRENDING_MIN_SCORE=0.3)
+    def test_scores_decay_and_prune_without_rewrites(self):
+        self.comment(self.posts[0], times=2)
+        self.comment(self.posts[1])
+        stored = PostScore.objects.get(post=self.posts[0]).score
+        later = time.time() + 120
+        self.assertAlmostEqual(current_score(stored, later), 0.5, places=3)
+        self.assertEqual(prune_scores(later), 1)
+        self.assertEqual(
+            list(PostScore.objects.values_list('post', 'score')),
+            [(self.posts[0].id, stored)]
+        )
@@ -0,0 +1,43 @@
+import logging
+
+from django.core.cache import cache
+from sorl.thumbnail import delete, get_thumbnail
+
+logger = logging.getLogger(__name__)
+
+# Те же параметры, что у {% thumbnail %} в шаблонах лент.
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def thumbnail_cache_key(image_name):
+    return f'thumbnail:{THUMBNAIL_GEOMETRY}:{image_name}'
+
+
+def get_cached_thumbnail_url(image):
+    return cache.get(thumbnail_cache_key(getattr(image, 'name', image)))
+
+
+def thumbnail_url(image):
+    """URL миниатюры картинки поста (файла или имени), None без картинки."""
+    if not image:
+        return None
+    name = getattr(image, 'name', image)
+    key = thumbnail_cache_key(name)
+    url = cache.get(key)
+    if url is None:
+        try:
+            url = get_thumbnail(
+                image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS
+            ).url
+        except Exception:
+            logger.exception('Не удалось создать миниатюру %s', name)
+            return None
+        cache.set(key, url, None)
+    return url
+
+
+def delete_image(name):
+    """Удаляет картинку, её миниатюры sorl и URL миниатюры из кеша."""
+    delete(name)
+    cache.delete(thumbnail_cache_key(name))
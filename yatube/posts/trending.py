@@ -0,0 +1,70 @@
+"""Рейтинг ленты «Популярное» с затуханием без перезаписи строк.
+
+Вклад комментария, оставленного в момент t, равен
+weight * 2 ** (t / TRENDING_HALF_LIFE): чем позже комментарий, тем больше
+его вес, а порядок постов совпадает с порядком по затухающему рейтингу.
+Чтобы числа не переполнялись, в PostScore.score хранится натуральный
+логарифм суммы. Значение строки меняется только новым комментарием,
+поэтому курсор страницы не сбивается со временем.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Exp, Greatest, Least, Ln
+
+from .models import PostScore
+from .pagination import paginate_by_cursor
+
+
+def time_offset(now=None):
+    """Логарифм множителя 2 ** (now / TRENDING_HALF_LIFE)."""
+    if now is None:
+        now = time.time()
+    return now * math.log(2) / settings.TRENDING_HALF_LIFE
+
+
+def current_score(stored, now=None):
+    """Рейтинг на момент now из значения PostScore.score."""
+    return math.exp(stored - time_offset(now))
+
+
+def log_add(field, value):
+    """ln(e ** field + e ** value) без переполнения, для UPDATE."""
+    value = Value(value, output_field=FloatField())
+    high = Greatest(field, value)
+    low = Least(field, value)
+    return high + Ln(Value(1.0, output_field=FloatField()) + Exp(low - high))
+
+
+def record_comment(post_id):
+    """Поднимает рейтинг поста одним UPDATE после нового комментария."""
+    value = math.log(settings.TRENDING_COMMENT_SCORE) + time_offset()
+    scores = PostScore.objects.filter(post_id=post_id)
+    if scores.update(score=log_add(F('score'), value)):
+        return
+    try:
+        with transaction.atomic():
+            PostScore.objects.create(post_id=post_id, score=value)
+    except IntegrityError:
+        scores.update(score=log_add(F('score'), value))
+
+
+def prune_scores(now=None):
+    """Удаляет посты, чей рейтинг остыл ниже TRENDING_MIN_SCORE.
+
+    Возвращает число удалённых строк.
+    """
+    threshold = math.log(settings.TRENDING_MIN_SCORE) + time_offset(now)
+    removed, _ = PostScore.objects.filter(score__lt=threshold).delete()
+    return removed
+
+
+def get_hot_page(cursor=None):
+    """Страница популярных постов по индексу (-score, -post)."""
+    scores = PostScore.objects.select_related('post__author', 'post__group')
+    return paginate_by_cursor(
+        scores, 'score', cursor, settings.TRENDING_PAGE_SIZE
+    )
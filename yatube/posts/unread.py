@@ -0,0 +1,94 @@
+"""Счётчик новых постов в ленте подписок для шапки сайта.
+
+Счётчик хранится в FeedCursor и кеше. Отметка заводится при подписке,
+пост автора увеличивает счётчик всем подписчикам одним UPDATE в фоновой
+задаче, открытие ленты сбрасывает. Шапка только читает: кеш, а при
+промахе FeedCursor. Кеш сбрасывает фоновый воркер, поэтому он должен
+быть общим; FEED_UNREAD_CACHE_TIMEOUT ограничивает устаревание, если нет.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max, Value
+from django.db.models.functions import Greatest
+
+from .follows import following_posts
+from .models import FeedCursor, Follow, Post
+
+
+def unread_cache_key(user_id):
+    return f'feed_unread:{user_id}'
+
+
+def create_cursor(user_id):
+    """Заводит отметку: всё, что вышло до подписки, новым не считается."""
+    if FeedCursor.objects.filter(user_id=user_id).exists():
+        return
+    last_post_id = Post.objects.aggregate(last_id=Max('id'))['last_id']
+    FeedCursor.objects.get_or_create(
+        user_id=user_id, defaults={'last_seen_post_id': last_post_id or 0}
+    )
+
+
+def get_unread_count(user_id):
+    key = unread_cache_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = FeedCursor.objects.filter(user_id=user_id).values_list(
+            'unread', flat=True
+        ).first() or 0
+        cache.set(key, count, settings.FEED_UNREAD_CACHE_TIMEOUT)
+    return count
+
+
+def unread_label(count):
+    """'' без новых постов, иначе число, но не больше FEED_UNREAD_CAP+."""
+    cap = settings.FEED_UNREAD_CAP
+    if not count:
+        return ''
+    if count > cap:
+        return f'{cap}+'
+    return str(count)
+
+
+def post_published(author_id):
+    """+1 к счётчикам подписчиков автора одним UPDATE."""
+    followers = Follow.objects.filter(author_id=author_id).values('user_id')
+    FeedCursor.objects.filter(
+        user_id__in=followers, unread__lte=settings.FEED_UNREAD_CAP
+    ).update(unread=F('unread') + 1)
+    keys = []
+    for user_id in followers.values_list('user_id', flat=True).iterator():
+        keys.append(unread_cache_key(user_id))
+        if len(keys) == settings.FEED_UNREAD_CACHE_BATCH:
+            cache.delete_many(keys)
+            keys = []
+    cache.delete_many(keys)
+
+
+def mark_feed_seen(user_id, posts):
+    """Сбрасывает счётчик, когда пользователь открыл ленту подписок."""
+    if not get_unread_count(user_id):
+        return
+    last_post_id = max((post.id for post in posts), default=0)
+    # На дальних страницах ленты отметка не должна откатываться назад.
+    FeedCursor.objects.filter(user_id=user_id).update(
+        unread=0,
+        last_seen_post_id=Greatest('last_seen_post_id', Value(last_post_id)),
+    )
+    cache.set(
+        unread_cache_key(user_id), 0, settings.FEED_UNREAD_CACHE_TIMEOUT
+    )
+
+
+def recount_unread(user_id):
+    """Точный пересчёт после смены подписок: не больше CAP + 1 строк."""
+    cursor = FeedCursor.objects.filter(user_id=user_id).first()
+    if cursor is None:
+        return
+    new_posts = following_posts(user_id).filter(
+        id__gt=cursor.last_seen_post_id
+    ).order_by()[:settings.FEED_UNREAD_CAP + 1]
+    FeedCursor.objects.filter(user_id=user_id).update(
+        unread=new_posts.count()
+    )
+    cache.delete(unread_cache_key(user_id))
@@ -6,15 +6,32 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('hot/', views.hot_index, name='hot_index'),
+    path('groups/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_list, name='group_list'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments, name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment, name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/like/',
+        views.post_like, name='post_like'
+    ),
+    path(
+        'posts/<int:post_id>/unlike/',
+        views.post_unlike, name='post_unlike'
+    ),
+    path(
+        'notifications/', views.notifications, name='notifications'
+    ),
     path('follow/', views.follow_index, name='follow_index'),
     path(
         'profile/<str:username>/follow/',
@@ -2,16 +2,56 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
-from django.shortcuts import redirect, render, get_object_or_404
+from django.http import Http404
+from django.shortcuts import redirect, get_object_or_404
+from django.views.decorators.http import require_POST
+from django.utils.functional import cached_property
 
+from core.rendering import render
+from core.routers import mark_user_write, use_replica
+
+from .archive import (
+    get_with_archive, in_archived_range, paginate_with_archive,
+)
+from .comments import load_threads, reply_parent
+from .follows import following_posts, is_following
 from .forms import PostForm, CommentForm
-from .models import Post, Group, Follow
+from .groups import (
+    get_group, get_group_post_count, group_directory, group_posts,
+)
+from .likes import like, liked_post_ids, unlike
+from .live import publish_post
+from .notifications import attach_post_texts, notify_comment
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Post,
+)
+from .pagination import CursorPage
+from .suggestions import get_suggestions
+from .trending import get_hot_page, record_comment
+from .unread import mark_feed_seen
 
 User = get_user_model()
 
 
-def get_page_context(queryset, request):
-    paginator = Paginator(queryset, settings.PAGINATOR_CONST)
+class CountedPaginator(Paginator):
+    """Paginator с заранее известным числом объектов вместо COUNT(*)."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        return self._count
+
+
+def get_page_context(queryset, request, count=None):
+    if count is None:
+        paginator = Paginator(queryset, settings.PAGINATOR_CONST)
+    else:
+        paginator = CountedPaginator(
+            queryset, settings.PAGINATOR_CONST, count
+        )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return {
@@ -21,55 +61,127 @@ def get_page_context(queryset, request):
     }
 
 
+def comments_of(model, post_id):
+    return model.objects.filter(post_id=post_id).select_related(
+        'author'
+    ).only(
+        'id', 'text', 'created', 'post', 'author', 'author__username',
+        'parent', 'depth', 'path',
+    )
+
+
+def get_comments_page(post_id, cursor=None):
+    """Страница веток: курсор идёт по корням, ответы читаются диапазоном."""
+    archived = None
+    if in_archived_range(post_id):
+        archived = comments_of(ArchivedComment, post_id).filter(depth=0)
+    page = paginate_with_archive(
+        comments_of(Comment, post_id).filter(depth=0), archived, 'created',
+        cursor, settings.COMMENTS_PAGE_SIZE
+    )
+    if not page.items:
+        return page
+    model = type(page.items[0])
+    return CursorPage(
+        load_threads(comments_of(model, post_id), page.items),
+        page.next_cursor,
+    )
+
+
+def parse_comment_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@use_replica
 def index(request):
     context = get_page_context(Post.objects.all(), request)
     return render(request, 'posts/index.html', context)
 
 
+@use_replica
+def hot_index(request):
+    hot_page = get_hot_page(request.GET.get('cursor'))
+    context = {
+        'page_obj': [score.post for score in hot_page.items],
+        'cursor': hot_page.next_cursor,
+        'hot': True,
+    }
+    return render(request, 'posts/hot.html', context)
+
+
+@use_replica
 def group_list(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_group(slug)
+    if group is None:
+        raise Http404('Группа не найдена.')
     template = 'posts/group_list.html'
     context = {
         'group': group,
     }
-    context.update(get_page_context(Post.objects.all(), request))
+    context.update(get_page_context(
+        group_posts(group.id), request, get_group_post_count(group.id)
+    ))
     return render(request, template, context)
 
 
+@use_replica
+def group_index(request):
+    context = {
+        'group_stats': group_directory(),
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
+@use_replica
 def profile(request, username):
     author = get_object_or_404(User, username=username)
     post_count = author.posts.all().count()
     context = {
         'post_count': post_count,
         'author': author,
+        'following': is_following(request.user, author.id),
+        'suggestions': get_suggestions(request.user),
     }
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user__username=request.user, author=author
-        )
-        context.update(
-            {'post_count': post_count,
-             'author': author,
-             'following': following, }
-        )
     context.update(get_page_context(author.posts.all(), request))
     return render(request, 'posts/profile.html', context)
 
 
+@use_replica
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_with_archive(
+        Post.objects.all(), ArchivedPost.objects.all(), post_id
+    )
+    if post is None:
+        raise Http404('Пост не найден.')
     form = CommentForm()
-    comments = post.comments.all()
+    comments_page = get_comments_page(post.id)
     count_post = post.author.posts.all().count()
     context = {
         'post': post,
         'count_post': count_post,
         'form': form,
-        'comments': comments,
+        'comments': comments_page.items,
+        'comments_cursor': comments_page.next_cursor,
+        'reply_to': parse_comment_id(request.GET.get('reply_to')),
+        'liked': liked_post_ids(request.user, [post]),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@use_replica
+def post_comments(request, post_id):
+    comments_page = get_comments_page(post_id, request.GET.get('cursor'))
+    context = {
+        'post_id': post_id,
+        'comments': comments_page.items,
+        'comments_cursor': comments_page.next_cursor,
+    }
+    return render(request, 'posts/includes/comments_list.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -80,6 +192,8 @@ def post_create(request):
         new_post = form.save(commit=False)
         new_post.author = request.user
         new_post.save()
+        mark_user_write()
+        publish_post(new_post)
         return redirect('posts:profile', request.user)
     return render(request, 'posts/create_post.html', {'form': form})
 
@@ -96,6 +210,7 @@ def post_edit(request, post_id):
         return redirect('posts:post_detail', post_id=post_id)
     if form.is_valid():
         form.save()
+        mark_user_write()
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'form': form,
@@ -113,15 +228,56 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        parent = None
+        parent_id = parse_comment_id(request.POST.get('parent'))
+        if parent_id is not None:
+            # Ответ на комментарий чужого поста становится корнем ветки.
+            parent = post.comments.filter(pk=parent_id).first()
+            comment.parent = reply_parent(parent)
         comment.save()
+        mark_user_write()
+        record_comment(post.id)
+        notify_comment(comment, post, parent)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
-def follow_index(request):
+def notifications(request):
+    """Входящие уведомления; открытая страница отмечается прочитанной."""
     context = get_page_context(
-        Post.objects.filter(author__following__user=request.user), request
+        request.user.notifications.select_related('actor'), request
     )
+    page_obj = context['page_obj']
+    page_obj.object_list = attach_post_texts(list(page_obj.object_list))
+    request.user.notifications.filter(
+        read=False, pk__in=[notification.pk for notification in page_obj]
+    ).update(read=True)
+    return render(request, 'posts/notifications.html', context)
+
+
+@login_required
+@require_POST
+def post_like(request, post_id):
+    post = get_object_or_404(Post, pk=post_id)
+    like(request.user.id, post.id)
+    mark_user_write()
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def post_unlike(request, post_id):
+    unlike(request.user.id, post_id)
+    mark_user_write()
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@use_replica
+def follow_index(request):
+    context = get_page_context(following_posts(request.user.id), request)
+    mark_feed_seen(request.user.id, context['page_obj'])
+    context['suggestions'] = get_suggestions(request.user)
     return render(request, 'posts/follow.html', context)
 
 
@@ -130,6 +286,7 @@ def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
         Follow.objects.get_or_create(author=author, user=request.user)
+        mark_user_write()
     return redirect('posts:profile', request.user)
 
 
@@ -139,4 +296,5 @@ def profile_unfollow(request, username):
     follow_obj = Follow.objects.filter(author=author, user=request.user)
     if follow_obj.exists:
         follow_obj.delete()
+        mark_user_write()
     return redirect('posts:profile', request.user)
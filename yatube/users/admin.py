@@ -0,0 +1,27 @@
+from django.contrib import admin, messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from .tasks import purge_user_content
+
+User = get_user_model()
+
+
+class PurgeUserAdmin(UserAdmin):
+
+    actions = ('purge_users',)
+
+    def purge_users(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
+        for user_id in user_ids:
+            purge_user_content.delay(user_id=user_id)
+        self.message_user(
+            request,
+            f'Поставлено в очередь на удаление: {len(user_ids)}',
+            messages.SUCCESS,
+        )
+    purge_users.short_description = 'Удалить со всем содержимым в фоне'
+
+
+admin.site.unregister(User)
+admin.site.register(User, PurgeUserAdmin)
@@ -1,6 +1,9 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
+
+from .tasks import send_email
 
 User = get_user_model()
 
@@ -17,3 +20,24 @@ class CreationForm(UserCreationForm):
             raise forms.ValidationError(
                 'Вы обязательно должны нас поблагодарить!')
         return data
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Рендерит письмо сразу, а отправку откладывает в очередь задач."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        html_body = None
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(
+                html_email_template_name, context
+            )
+        send_email.delay(
+            subject=''.join(subject.splitlines()),
+            body=loader.render_to_string(email_template_name, context),
+            from_email=from_email,
+            to=[to_email],
+            html_body=html_body,
+        )
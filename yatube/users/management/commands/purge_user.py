@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users.purge import purge_user
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет пользователя со всеми постами, комментариями и подписками '
+        'порциями по --batch-size строк, печатая прогресс.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.PURGE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        user_id = User.objects.filter(
+            username=options['username']
+        ).values_list('pk', flat=True).first()
+        if user_id is None:
+            raise CommandError('Пользователь не найден.')
+        for step, deleted in purge_user(user_id, options['batch_size']):
+            self.stdout.write(f'{step}: {deleted}')
@@ -0,0 +1,207 @@
+"""Удаление пользователя со всем содержимым порциями.
+
+Коллектор Django загружает в память все посты, комментарии и подписки
+пользователя и шлёт сигнал на каждую строку. Здесь строки удаляются
+сырыми DELETE ... WHERE id IN (...) по PURGE_BATCH_SIZE штук в отдельных
+транзакциях, а то, что делали сигналы, — счётчики групп, кеши подписок
+и постов, файлы картинок — выполняется один раз на порцию.
+"""
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+
+from api.cache import invalidate_posts
+from api.polling import invalidate_marks
+from posts.comments import path_segment, subtree_range
+from posts.follows import invalidate_following
+from posts.groups import group_posts_removed, invalidate_group_post_count
+from posts.likes import likes_removed
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, FollowGraphChange,
+    FollowSuggestion, Like, LikeCounterShard, LiveEvent, Notification, Post,
+    PostScore,
+)
+from posts.suggestions import mark_follow_graph_changed
+from posts.tasks import delete_images
+from posts.unread import recount_unread
+
+User = get_user_model()
+
+
+def raw_delete(model, pks):
+    using = router.db_for_write(model)
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {column} IN ({placeholders})', pks
+        )
+
+
+def delete_in_batches(queryset, batch_size, fields=(), on_batch=None):
+    """Удаляет строки queryset порциями, отдавая число удалённых.
+
+    on_batch получает кортежи (pk, *fields) удаляемой порции и
+    выполняется в той же транзакции.
+    """
+    if not queryset.query.order_by:
+        # Сортировка из Meta удалению не нужна.
+        queryset = queryset.order_by()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.values_list('pk', *fields)[:batch_size])
+            if not rows:
+                return
+            raw_delete(queryset.model, [row[0] for row in rows])
+            if on_batch is not None:
+                on_batch(rows)
+        deleted += len(rows)
+        yield deleted
+
+
+def remove_from_groups(rows):
+    """Вычитает порцию (pk, group, date, image) из сводки групп."""
+    removed = defaultdict(list)
+    for _, group_id, pub_date, _ in rows:
+        if group_id is not None:
+            removed[group_id].append(pub_date)
+    for group_id, pub_dates in removed.items():
+        group_posts_removed(group_id, pub_dates)
+    return removed
+
+
+def posts_deleted(rows):
+    """Счётчики групп, кеши и картинки для порции (pk, group, date, image)."""
+    invalidate_group_post_count(*remove_from_groups(rows))
+    invalidate_posts([row[0] for row in rows])
+    delete_images_later(rows)
+
+
+def archived_posts_deleted(rows):
+    # Посты архива тоже входят в сводку групп, см. posts.archive.
+    remove_from_groups(rows)
+    delete_images_later(rows)
+
+
+def delete_images_later(rows):
+    images = [row[-1] for row in rows if row[-1]]
+    if images:
+        # Задача пишется в той же транзакции, что и удаление постов.
+        delete_images.delay(image_names=images)
+
+
+def delete_replies(model, rows, batch_size):
+    """Удаляет ответы других пользователей на удалённые комментарии."""
+    for pk, post_id, path in rows:
+        low, high = subtree_range(path or path_segment(pk))
+        replies = model.objects.filter(
+            post_id=post_id, path__gt=low, path__lt=high
+        )
+        for _ in delete_in_batches(replies, batch_size):
+            pass
+
+
+def comments_deleted(rows, batch_size):
+    delete_replies(Comment, rows, batch_size)
+    invalidate_posts({post_id for _, post_id, _ in rows})
+
+
+def archived_comments_deleted(rows, batch_size):
+    delete_replies(ArchivedComment, rows, batch_size)
+
+
+def likes_deleted(rows):
+    likes_removed(post_id for _, post_id in rows)
+
+
+def followers_deleted(rows):
+    for _, follower_id in rows:
+        invalidate_following(follower_id)
+        mark_follow_graph_changed(follower_id)
+        # Посты автора уже удалены: счётчик новых постов пересчитывается.
+        recount_unread(follower_id)
+
+
+def purge_steps(user_id, batch_size):
+    """Шаги удаления: (название, queryset, поля, on_batch).
+
+    Комментарии удаляются от самых глубоких ответов к корням, чтобы
+    после каждой порции не оставалось ответов без родителя.
+    """
+    post_fields = ('group_id', 'pub_date', 'image')
+    comment_fields = ('post_id', 'path')
+    return (
+        ('уведомления', Notification.objects.filter(recipient_id=user_id),
+         (), None),
+        ('уведомления от пользователя',
+         Notification.objects.filter(actor_id=user_id), (), None),
+        ('уведомления о постах',
+         Notification.objects.filter(post__author_id=user_id), (), None),
+        ('уведомления о постах в архиве',
+         Notification.objects.filter(post_id__in=ArchivedPost.objects.filter(
+             author_id=user_id
+         ).values('id')), (), None),
+        ('комментарии к постам',
+         Comment.objects.filter(post__author_id=user_id).order_by('-depth'),
+         (), None),
+        ('комментарии пользователя',
+         Comment.objects.filter(author_id=user_id).order_by('-depth'),
+         comment_fields, partial(comments_deleted, batch_size=batch_size)),
+        ('рейтинги постов',
+         PostScore.objects.filter(post__author_id=user_id), (), None),
+        ('лайки постов', Like.objects.filter(post__author_id=user_id),
+         (), None),
+        ('счётчики лайков',
+         LikeCounterShard.objects.filter(post__author_id=user_id), (), None),
+        ('лайки пользователя', Like.objects.filter(user_id=user_id),
+         ('post_id',), likes_deleted),
+        ('посты', Post.objects.filter(author_id=user_id), post_fields,
+         posts_deleted),
+        ('комментарии к постам в архиве',
+         ArchivedComment.objects.filter(
+             post__author_id=user_id
+         ).order_by('-depth'), (), None),
+        ('комментарии пользователя в архиве',
+         ArchivedComment.objects.filter(
+             author_id=user_id
+         ).order_by('-depth'), comment_fields,
+         partial(archived_comments_deleted, batch_size=batch_size)),
+        ('посты в архиве', ArchivedPost.objects.filter(author_id=user_id),
+         post_fields, archived_posts_deleted),
+        ('подписчики', Follow.objects.filter(author_id=user_id),
+         ('user_id',), followers_deleted),
+        ('подписки', Follow.objects.filter(user_id=user_id), (), None),
+        ('рекомендации', FollowSuggestion.objects.filter(user_id=user_id),
+         (), None),
+        ('рекомендации другим',
+         FollowSuggestion.objects.filter(candidate_id=user_id), (), None),
+        ('события живой ленты',
+         LiveEvent.objects.filter(author_id=user_id), (), None),
+    )
+
+
+def purge_user(user_id, batch_size=None):
+    """Удаляет пользователя и его содержимое, отдавая прогресс.
+
+    Генератор: после каждой порции отдаёт пару (шаг, удалено строк на
+    этом шаге). Память не зависит от объёма содержимого.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    steps = purge_steps(user_id, batch_size)
+    for name, queryset, fields, on_batch in steps:
+        for deleted in delete_in_batches(
+            queryset, batch_size, fields, on_batch
+        ):
+            yield name, deleted
+    invalidate_following(user_id)
+    invalidate_marks(user_id)
+    FollowGraphChange.objects.filter(user_id=user_id).delete()
+    # Содержимого не осталось, коллектору остаются только мелкие связи.
+    User.objects.filter(pk=user_id).delete()
+    yield 'пользователь', 1
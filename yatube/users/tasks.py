@@ -0,0 +1,26 @@
+import logging
+
+from django.core.mail import EmailMultiAlternatives
+
+from jobs.queue import task
+
+from .purge import purge_user
+
+logger = logging.getLogger(__name__)
+
+
+@task
+def send_email(subject, body, from_email, to, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body is not None:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
+
+
+@task
+def purge_user_content(user_id):
+    """Удаляет пользователя со всем содержимым, см. users.purge."""
+    for step, deleted in purge_user(user_id):
+        logger.info(
+            'Удаление пользователя %s: %s — %s', user_id, step, deleted
+        )
@@ -0,0 +1,85 @@
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import ArchivedPost, Comment, Follow, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, EXPORT_CHUNK_SIZE=2,
+    EXPORT_FILE_CHUNK_SIZE=16,
+)
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.image = b'GIF89a' + bytes(range(64))
+        cls.posts = [
+            Post.objects.create(text=f'пост {i}', author=cls.user)
+            for i in range(3)
+        ]
+        cls.posts[0].image = SimpleUploadedFile('a.gif', cls.image)
+        cls.posts[0].save()
+        ArchivedPost.objects.create(
+            id=1000, text='старый пост', author=cls.user,
+            pub_date=cls.posts[0].pub_date,
+        )
+        Comment.objects.create(
+            post=cls.posts[1], author=cls.user, text='комментарий'
+        )
+        Follow.objects.create(user=cls.user, author=cls.other)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def download(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('users:export'))
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+
+    def read_jsonl(self, archive, name):
+        return [
+            json.loads(line)
+            for line in archive.read(name).decode().splitlines()
+        ]
+
+    def test_export_contains_user_data(self):
+        archive = self.download()
+        posts = self.read_jsonl(archive, 'posts.jsonl')
+        self.assertEqual(
+            [(post['text'], post['archived']) for post in posts],
+            [('пост 0', False), ('пост 1', False), ('пост 2', False),
+             ('старый пост', True)],
+        )
+        comments = self.read_jsonl(archive, 'comments.jsonl')
+        self.assertEqual(comments[0]['post_id'], self.posts[1].id)
+        self.assertEqual(
+            self.read_jsonl(archive, 'follows.jsonl'),
+            [{'author__username': 'other'}],
+        )
+        self.assertEqual(
+            archive.read(f'images/{self.posts[0].image.name}'), self.image
+        )
+
+    def test_export_requires_login(self):
+        response = self.client.get(reverse('users:export'))
+        self.assertEqual(response.status_code, 302)
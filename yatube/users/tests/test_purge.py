@@ -0,0 +1,142 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from jobs.models import Job
+from jobs.queue import run_pending
+from posts.follows import get_following_ids
+from posts.likes import like
+from posts.models import (
+    Comment, FeedCursor, Follow, FollowSuggestion, Group, GroupStats, Like,
+    LikeCounterShard, Notification, Post,
+)
+from posts.notifications import notify_comment
+from posts.unread import get_unread_count, recount_unread
+
+User = get_user_model()
+
+
+class PurgeUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='spammer')
+        self.other = User.objects.create_user(username='other')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.posts = [
+            Post.objects.create(
+                text=f'post {i}', author=self.user, group=self.group
+            )
+            for i in range(5)
+        ]
+        Post.objects.filter(pk=self.posts[0].pk).update(image='posts/a.gif')
+        self.kept = Post.objects.create(
+            text='kept', author=self.other, group=self.group
+        )
+        Comment.objects.create(
+            post=self.posts[1], author=self.other, text='ответ'
+        )
+        Comment.objects.create(post=self.kept, author=self.user, text='спам')
+        Follow.objects.create(user=self.other, author=self.user)
+        Follow.objects.create(user=self.user, author=self.other)
+        FollowSuggestion.objects.create(
+            user=self.other, candidate=self.user, score=1
+        )
+
+    def purge(self):
+        call_command(
+            'purge_user', 'spammer', batch_size=2,
+            stdout=open(os.devnull, 'w'),
+        )
+
+    def test_content_removed(self):
+        self.purge()
+        self.assertFalse(User.objects.filter(username='spammer').exists())
+        self.assertEqual(list(Post.objects.all()), [self.kept])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(FollowSuggestion.objects.exists())
+
+    def test_group_stats_consistent(self):
+        self.purge()
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.post_count, 1)
+        self.assertEqual(stats.posts_last_week, 1)
+        self.assertEqual(stats.last_post_at, self.kept.pub_date)
+
+    def test_follower_cache_invalidated(self):
+        self.assertIn(self.user.id, get_following_ids(self.other.id))
+        self.purge()
+        self.assertNotIn(self.user.id, get_following_ids(self.other.id))
+
+    def test_image_deletion_enqueued(self):
+        self.purge()
+        job = Job.objects.get(task='posts.tasks.delete_images')
+        self.assertEqual(
+            json.loads(job.payload), {'image_names': ['posts/a.gif']}
+        )
+
+    def test_admin_action_enqueues_purge(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        self.client.force_login(admin)
+        self.client.post(reverse('admin:auth_user_changelist'), {
+            'action': 'purge_users',
+            '_selected_action': [self.user.pk],
+        })
+        job = Job.objects.get(task='users.tasks.purge_user_content')
+        self.assertEqual(json.loads(job.payload), {'user_id': self.user.pk})
+        self.assertTrue(Post.objects.filter(author=self.user).exists())
+
+    def test_replies_to_user_comments_removed(self):
+        spam = Comment.objects.get(author=self.user)
+        reply = Comment.objects.create(
+            post=self.kept, author=self.other, text='ответ', parent=spam
+        )
+        Comment.objects.create(
+            post=self.kept, author=self.other, text='ещё', parent=reply
+        )
+        self.purge()
+        self.assertFalse(Comment.objects.exists())
+
+    def test_likes_removed_and_counters_fixed(self):
+        like(self.user.id, self.kept.id)
+        like(self.other.id, self.kept.id)
+        like(self.other.id, self.posts[0].id)
+        self.purge()
+        self.assertEqual(
+            list(Like.objects.values_list('post_id', flat=True)),
+            [self.kept.id],
+        )
+        self.assertFalse(
+            LikeCounterShard.objects.exclude(post=self.kept).exists()
+        )
+        call_command('aggregate_likes', stdout=open(os.devnull, 'w'))
+        self.kept.refresh_from_db()
+        self.assertEqual(self.kept.like_count, 1)
+
+    def test_notifications_removed(self):
+        notify_comment(
+            Comment.objects.get(author=self.other), self.posts[1]
+        )
+        notify_comment(Comment.objects.get(author=self.user), self.kept)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.purge()
+        self.assertFalse(Notification.objects.exists())
+
+    def test_follower_unread_count_reset(self):
+        run_pending()
+        recount_unread(self.other.id)
+        Post.objects.create(text='новый', author=self.user)
+        run_pending()
+        self.assertEqual(FeedCursor.objects.get(user=self.other).unread, 1)
+        self.purge()
+        self.assertEqual(FeedCursor.objects.get(user=self.other).unread, 0)
+        self.assertEqual(get_unread_count(self.other.id), 0)
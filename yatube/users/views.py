@@ -1,6 +1,9 @@
+from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 
+from .export import stream_export
 from .forms import CreationForm
 
 
@@ -16,3 +19,15 @@ class PasswordChangeForm(CreateView):
     form_class = CreationForm
     success_url = reverse_lazy('posts:index')
     template_name = 'users/spassword_change_form.html'
+
+
+@login_required
+def export(request):
+    """Zip с постами, комментариями, подписками и картинками."""
+    response = StreamingHttpResponse(
+        stream_export(request.user.id), content_type='application/zip'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{request.user.username}.zip"'
+    )
+    return response
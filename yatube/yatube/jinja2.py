@@ -0,0 +1,84 @@
+"""Окружение Jinja2 с аналогами тегов и фильтров шаблонов Django.
+
+{% url %} -> url(), {% static %} -> static(), {% thumbnail %} ->
+thumbnail_url(), {% csrf_token %} -> csrf_input, {% cache %} ->
+{% cache timeout, 'name', ... %}, addclass и date — те же фильтры, что в
+шаблонах Django.
+"""
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template import defaultfilters
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment, Undefined, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from core.templatetags.user_filters import addclass
+from posts.follows import follow_statuses
+from posts.likes import liked_post_ids
+from posts.thumbnails import thumbnail_url
+
+
+def url(viewname, *args, **kwargs):
+    return reverse(viewname, args=args or None, kwargs=kwargs or None)
+
+
+def date(value, arg=None):
+    """Фильтр date с переводом во временную зону, как в шаблонах Django."""
+    return defaultfilters.date(template_localtime(value), arg)
+
+
+def followed_authors(user, objects):
+    """Аналог {% followed_authors %} из posts.templatetags.follow_tags."""
+    return follow_statuses(user, {obj.author_id for obj in objects})
+
+
+class FragmentCacheExtension(Extension):
+    """Кеш фрагмента с теми же ключами, что у {% cache %} Django."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        call = self.call_method('_cache', [nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache(self, args, caller):
+        timeout, fragment_name, *vary_on = args
+        try:
+            fragment_cache = caches['template_fragments']
+        except InvalidCacheBackendError:
+            fragment_cache = caches['default']
+        key = make_template_fragment_key(fragment_name, vary_on)
+        value = fragment_cache.get(key)
+        if value is None:
+            value = caller()
+            fragment_cache.set(key, value, timeout)
+        return Markup(value)
+
+
+def environment(**options):
+    # Как в шаблонах Django: неизвестная переменная выводится пустой
+    # строкой, а не отладочным {{ name }} при DEBUG.
+    options['undefined'] = Undefined
+    env = Environment(**options)
+    env.add_extension(FragmentCacheExtension)
+    env.globals.update({
+        'url': url,
+        'static': static,
+        'thumbnail_url': thumbnail_url,
+        'followed_authors': followed_authors,
+        'liked_posts': liked_post_ids,
+    })
+    env.filters.update({
+        'addclass': addclass,
+        'date': date,
+        'truncatechars': defaultfilters.truncatechars,
+    })
+    return env
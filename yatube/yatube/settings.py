@@ -39,6 +39,8 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
     'sorl.thumbnail'
 ]
 
@@ -47,7 +49,9 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -68,13 +72,37 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'posts.context_processors.feed_unread',
+            ],
+        },
+    },
+    {
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'NAME': 'jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+        'OPTIONS': {
+            'environment': 'yatube.jinja2.environment',
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+                'posts.context_processors.feed_unread',
             ],
         },
     },
 ]
 
+# View из этого списка рендерятся шаблонами Jinja2 из BASE_DIR/jinja2.
+# Портированы: posts:index, posts:follow_index, posts:profile,
+# posts:post_detail и posts:post_comments.
+JINJA2_VIEWS = []
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Прогрев шаблонов, URL и соединений при импорте yatube.wsgi.
+WARMUP_ON_STARTUP = False
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -83,7 +111,35 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 600,
+    },
+    # Локальная замена реплики: чтобы включить её, добавьте алиас
+    # в DATABASE_REPLICAS.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
+        'CONN_MAX_AGE': 600,
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Алиасы баз, с которых читают ленты и страница поста.
+DATABASE_REPLICAS = []
+
+# После записи чтения пользователя идут в primary столько секунд.
+REPLICA_PIN_COOKIE = 'pin_primary'
+REPLICA_PIN_SECONDS = 10
+
+# PRAGMA, которые core.db применяет к каждому новому соединению SQLite.
+# WAL позволяет читателям не ждать запись в add_comment и post_create.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
 }
 
 
@@ -129,6 +185,109 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 PAGINATOR_CONST = 10
 
+COMMENTS_PAGE_SIZE = 20
+# Ответы глубже COMMENT_MAX_DEPTH встают рядом с родителем.
+COMMENT_MAX_DEPTH = 4
+
+API_PAGE_SIZE = 20
+
+# Подписки сбрасываются из кеша при каждом изменении; без общего кеша
+# другие воркеры видят старый список не дольше FOLLOWING_CACHE_TIMEOUT.
+FOLLOWING_CACHE_TIMEOUT = 60 * 5
+
+# Больше подписок фильтруем подзапросом, а не списком id в IN (...).
+FOLLOWING_IN_LIMIT = 500
+
+FOLLOW_SUGGESTIONS_TOP_K = 5
+
+GROUP_CACHE_TIMEOUT = 60 * 60
+
+# Окно «постов за неделю» в каталоге групп; rebuild_group_stats
+# по расписанию убирает из него устаревшие посты.
+GROUP_STATS_RECENT_DAYS = 7
+
+# Лента «Популярное»: вес комментария и полураспад рейтинга в секундах;
+# prune_trending по расписанию удаляет посты с рейтингом ниже
+# TRENDING_MIN_SCORE. Смена TRENDING_HALF_LIFE требует пересчёта PostScore.
+TRENDING_COMMENT_SCORE = 1.0
+TRENDING_HALF_LIFE = 6 * 60 * 60
+TRENDING_MIN_SCORE = 0.05
+TRENDING_PAGE_SIZE = 10
+
+# Счётчик новых постов ленты подписок в шапке: показывается не больше
+# FEED_UNREAD_CAP+, кеш сбрасывается порциями по FEED_UNREAD_CACHE_BATCH.
+# Сбрасывает его фоновый воркер, так что без общего кеша значение
+# в шапке отстаёт не дольше FEED_UNREAD_CACHE_TIMEOUT секунд.
+FEED_UNREAD_CAP = 99
+FEED_UNREAD_CACHE_TIMEOUT = 60
+FEED_UNREAD_CACHE_BATCH = 500
+
+# Дайджест уведомлений: получателей на одну пачку send_messages и
+# уведомлений в одном письме.
+DIGEST_BATCH_SIZE = 100
+DIGEST_MAX_ITEMS = 20
+
+# Лайк меняет один из LIKE_COUNTER_SHARDS шардов счётчика поста,
+# aggregate_likes переносит их в Post.like_count порциями.
+LIKE_COUNTER_SHARDS = 16
+LIKE_AGGREGATE_CHUNK_SIZE = 500
+
+# Посты старше ARCHIVE_AFTER_DAYS дней archive_posts переносит в архив.
+ARCHIVE_AFTER_DAYS = 365
+ARCHIVE_CHUNK_SIZE = 500
+ARCHIVE_CACHE_TIMEOUT = 60 * 60
+
+# Удаление пользователя: строк в одном DELETE и одной транзакции.
+PURGE_BATCH_SIZE = 500
+
+# Выгрузка данных пользователя: строк за запрос и байт картинки за чтение.
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FILE_CHUNK_SIZE = 64 * 1024
+
+# Лимиты на маршруты: запросов в секунду/минуту/час/день с одного
+# пользователя и отдельно с одного IP. По умолчанию считаются только POST.
+RATELIMITS = {
+    'posts:add_comment': {'rate': '20/m'},
+    'posts:post_create': {'rate': '10/m'},
+    'posts:profile_follow': {'rate': '30/m', 'methods': ['GET']},
+    'posts:profile_unfollow': {'rate': '30/m', 'methods': ['GET']},
+    'users:signup': {'rate': '5/m'},
+    'users:login': {'rate': '10/m'},
+}
+RATELIMIT_DEFAULT_METHODS = ['POST']
+
+# Очередь фоновых задач: повтор через JOBS_RETRY_BACKOFF * 2 ** n секунд,
+# задача без отклика дольше JOBS_LOCK_TIMEOUT возвращается в очередь.
+# Пока задача выполняется, воркер продлевает захват каждые
+# JOBS_HEARTBEAT_INTERVAL секунд.
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF = 30
+JOBS_LOCK_TIMEOUT = 60 * 10
+JOBS_HEARTBEAT_INTERVAL = JOBS_LOCK_TIMEOUT / 4
+# Выполненные и упавшие задачи хранятся JOBS_KEEP_FINISHED секунд.
+JOBS_KEEP_FINISHED = 60 * 60 * 24 * 7
+JOBS_POLL_INTERVAL = 1.0
+
+API_BATCH_MAX_IDS = 50
+
+API_POST_CACHE_TIMEOUT = 60 * 5
+
+# Опрос «есть ли новые посты»: не больше API_NEW_POSTS_LIMIT id в ответе.
+# Отметки последних постов лент публикация сдвигает в кеше, а через
+# API_FEED_MARK_TIMEOUT секунд они пересчитываются из базы, так что
+# воркер без общего кеша отстаёт не дольше этого.
+API_NEW_POSTS_LIMIT = 50
+API_FEED_MARK_TIMEOUT = 10
+
+# Живая лента (SSE): heartbeat и опрос LiveEvent в секундах, не больше
+# LIVE_QUEUE_SIZE непрочитанных событий на соединение.
+LIVE_RELAY = True
+LIVE_HEARTBEAT = 15
+LIVE_RETRY_MS = 3000
+LIVE_QUEUE_SIZE = 100
+LIVE_POLL_INTERVAL = 1.0
+LIVE_EVENT_TTL = 60 * 10
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
@@ -140,3 +299,9 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Сессии читаются из кеша с записью в базу, пользователь запроса тоже
+# берётся из кеша, см. core.middleware.CachedAuthenticationMiddleware.
+# В боевом профиле кеш общий для воркеров, см. settings_production.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
@@ -0,0 +1,38 @@
+"""Боевой профиль настроек.
+
+DJANGO_SETTINGS_MODULE=yatube.settings_production
+"""
+import copy
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import SECRET_KEY, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('SECRET_KEY', SECRET_KEY)
+
+# Шаблоны компилируются один раз на процесс и дальше берутся из памяти;
+# Jinja2 без auto_reload при DEBUG = False кеширует их сам. Остальные
+# настройки DjangoTemplates, в том числе context_processors, берутся из
+# settings.py, чтобы профили не расходились.
+django_templates = copy.deepcopy(TEMPLATES[0])
+django_templates.pop('APP_DIRS', None)
+django_templates['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES = [django_templates, TEMPLATES[1]]
+
+WARMUP_ON_STARTUP = True
+
+# Сессии, пользователи, лимиты и счётчики лент сбрасываются из любого
+# воркера и фоновых задач, поэтому кеш у всех процессов один.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ.get('MEMCACHED_LOCATION', '127.0.0.1:11211'),
+    }
+}